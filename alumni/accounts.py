@@ -0,0 +1,105 @@
+"""
+Which User an OTP login signs in, and linking it to the Alumni row.
+
+resolve_login() replaces the probe-by-probe lookups verify_otp_view used
+to make (8-12 queries and an IntegrityError it had to swallow). It reads
+every candidate Alumni row in one query and every candidate User in one
+more, inside a transaction that locks the Alumni rows (SELECT ... FOR
+UPDATE, a no-op on SQLite). Concurrent logins for the same person
+therefore queue up instead of racing to link or create users. A username
+collision with an unrelated login is retried once.
+"""
+import logging
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .contacts import contact_q, is_email
+from .models import Alumni
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS = 2
+
+
+def _pick_alumni(candidates, alumni_id):
+    """The session's row if given, else the newest contact match, preferring linked rows."""
+    for alumni in candidates:
+        if alumni_id and alumni.pk == alumni_id:
+            return alumni
+    ranked = sorted(candidates, key=lambda a: (a.user_id is not None, a.created_at, a.pk), reverse=True)
+    return ranked[0] if ranked else None
+
+
+def _free_username(base, taken):
+    username, i = base, 1
+    while username in taken:
+        username = f"{base}_{i}"
+        i += 1
+    return username
+
+
+def _resolve(contact, alumni_id):
+    lookup = contact_q(contact)
+    if alumni_id:
+        lookup |= Q(pk=alumni_id)
+    # Query 1: every Alumni row that could be this person, locked, with its user
+    candidates = list(
+        Alumni.objects.select_for_update(of=('self',)).select_related('user').filter(lookup)
+    )
+    alumni = _pick_alumni(candidates, alumni_id)
+    if alumni is None:
+        return None, None
+    if alumni.user:
+        return alumni.pk, alumni.user
+
+    # A row for the same contact may already own a user: reuse it (and keep that row)
+    for other in candidates:
+        if other.user and other.pk != alumni.pk:
+            return other.pk, other.user
+
+    # Query 2: users named after the contact, plus the names a new user would collide with
+    likely = [name for name in (contact, alumni.email, alumni.contact_number) if name]
+    base = contact or alumni.email or alumni.contact_number or (alumni.name or "user").replace(" ", "").lower()
+    users = list(
+        User.objects.select_for_update(of=('self',))
+        .filter(Q(username__in=likely + [base]) | Q(username__startswith=f"{base}_"))
+        .annotate(owner_id=F('alumni__id'))
+    )
+    by_name = {u.username: u for u in users}
+
+    user = next((by_name[name] for name in likely if name in by_name), None)
+    if user is None:
+        user = User(
+            username=_free_username(base, by_name),
+            email=(contact if is_email(contact) else (alumni.email or "")),
+            first_name=(alumni.name.split()[0] if alumni.name else ""),
+        )
+        user.set_unusable_password()
+        user.save()
+    elif user.owner_id and user.owner_id != alumni.pk:
+        # Someone else already owns this user; don't relink.
+        logger.warning("User %s already linked to another Alumni. Skipping relink.", user.id)
+        return user.owner_id, user
+
+    alumni.user = user
+    alumni.save(update_fields=['user'])
+    return alumni.pk, user
+
+
+def resolve_login(contact, alumni_id=None):
+    """
+    (alumni_id, user) for a contact that just passed OTP verification,
+    creating the User and linking it when needed. ``alumni_id`` is the row
+    linked to ``user``. Returns (None, None) if no profile matches.
+    """
+    for attempt in range(ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return _resolve(contact, alumni_id)
+        except IntegrityError:
+            # Lost a race for a new username (or the link) to another login; start over
+            if attempt == ATTEMPTS - 1:
+                raise
+            logger.warning("[login] IntegrityError resolving %s; retrying", contact)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Alumni, OTPVerification, AdminUser
+from django.utils import timezone
+
+from .models import Alumni, AlumniStat, OTPVerification, AdminUser, Job, ProviderHealth
 
 admin.site.site_header = "UCMS Alumni Portal Administration"
 admin.site.site_title = "UCMS Admin"
@@ -8,7 +10,7 @@ admin.site.index_title = "Welcome to the Admin Dashboard"
 @admin.register(Alumni)
 class AlumniAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'joining_year_ug', 'specialty', 'status', 'created_at']
-    list_filter = ['status', 'joining_year_ug', 'specialty', 'country']
+    list_filter = ['status', 'joining_year_ug', 'specialty', 'country', 'photo_available']
     search_fields = ['name', 'email', 'contact_number']
     readonly_fields = ['created_at', 'updated_at']
 
@@ -22,3 +24,63 @@ class OTPVerificationAdmin(admin.ModelAdmin):
 class AdminUserAdmin(admin.ModelAdmin):
     list_display = ['user', 'is_super_admin', 'created_at']
     list_filter = ['is_super_admin', 'created_at']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at', 'updated_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['kind', 'last_error']
+    # The payload names who gets a message (and, for jobs queued by older
+    # code, the OTP itself): only its keys are shown
+    exclude = ['payload']
+    readonly_fields = ['kind', 'payload_keys', 'attempts', 'locked_by', 'locked_at',
+                       'last_error', 'expires_at', 'created_at', 'updated_at']
+    actions = ['retry_now']
+
+    @admin.display(description='Payload')
+    def payload_keys(self, obj):
+        return ', '.join(sorted(obj.payload)) or '-'
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued', run_after=timezone.now(), attempts=0, locked_by='', locked_at=None,
+        )
+        self.message_user(request, f'{updated} jobs queued for retry')
+
+
+@admin.register(ProviderHealth)
+class ProviderHealthAdmin(admin.ModelAdmin):
+    list_display = ['provider', 'channel', 'worker', 'state', 'calls', 'error_rate', 'p50_ms', 'p95_ms', 'updated_at']
+    list_filter = ['channel', 'provider']
+    readonly_fields = ['channel', 'provider', 'worker', 'stats', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Circuit')
+    def state(self, obj):
+        return obj.stats.get('state')
+
+    def calls(self, obj):
+        return obj.stats.get('calls')
+
+    def error_rate(self, obj):
+        return obj.stats.get('error_rate')
+
+    def p50_ms(self, obj):
+        return obj.stats.get('p50_ms')
+
+    def p95_ms(self, obj):
+        return obj.stats.get('p95_ms')
+
+
+@admin.register(AlumniStat)
+class AlumniStatAdmin(admin.ModelAdmin):
+    list_display = ['dimension', 'value', 'status', 'count', 'updated_at']
+    list_filter = ['dimension', 'status']
+    search_fields = ['value']
+    readonly_fields = ['dimension', 'value', 'status', 'count', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
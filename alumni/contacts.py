@@ -0,0 +1,61 @@
+"""
+Canonical forms of e-mail addresses and phone numbers.
+
+Alumni.save() stores them in email_normalized / phone_e164 (both indexed),
+so a login contact resolves with one index probe:
+
+    Alumni.objects.filter(contact_q(contact))
+
+"+91 98765 43210", "098765 43210", "9876543210" and "919876543210" all
+become "+919876543210". Numbers without a country code get
+DEFAULT_PHONE_COUNTRY_CODE (91).
+"""
+import re
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def normalize_email(value) -> str:
+    return str(value or '').strip().lower()
+
+
+def normalize_phone(value) -> str:
+    """E.164 ('+<country><number>'), or '' if ``value`` can't be a phone number."""
+    raw = str(value or '').strip()
+    digits = re.sub(r'\D', '', raw)
+    country = str(getattr(settings, 'DEFAULT_PHONE_COUNTRY_CODE', '91'))
+    if raw.startswith('00'):
+        digits = digits[2:]
+    elif not raw.startswith('+'):
+        if len(digits) == 11 and digits.startswith('0'):
+            digits = digits[1:]            # trunk prefix
+        if len(digits) == 10:
+            digits = country + digits
+    if not 8 <= len(digits) <= 15:
+        return ''
+    return '+' + digits
+
+
+def is_email(value) -> bool:
+    return '@' in str(value or '')
+
+
+def contact_q(contact):
+    """Q() matching Alumni rows for a login contact (e-mail or phone)."""
+    if is_email(contact):
+        key, field = normalize_email(contact), 'email_normalized'
+    else:
+        key, field = normalize_phone(contact), 'phone_e164'
+    # An empty key must not match every row with an empty column
+    return Q(**{field: key}) if key else Q(pk__in=[])
+
+
+def contacts_q(email=None, phone=None):
+    """Rows sharing the e-mail or the phone number (registration duplicate check)."""
+    q = Q(pk__in=[])
+    if normalize_email(email):
+        q |= Q(email_normalized=normalize_email(email))
+    if normalize_phone(phone):
+        q |= Q(phone_e164=normalize_phone(phone))
+    return q
@@ -0,0 +1,161 @@
+"""
+Facet counts for the alumni directory.
+
+For the current result set, facet_counts() runs one grouped COUNT per
+FACETS field. It caches the counts per normalized filter set for
+FACET_CACHE_SECONDS. Cache keys carry a version number that
+invalidate_facets() bumps whenever approved Alumni rows change, or rows
+join or leave the approved set (signals.py, and the importer after bulk
+writes), so a stale entry is never read again.
+
+Clicking a facet value adds an exact filter (?city=Pune) on top of the
+free-text filters; selected_facets() reads those back.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+# Alumni field -> panel label, in display order
+FACETS = {
+    'specialty': 'Specialty',
+    'country': 'Country',
+    'state': 'State',
+    'city': 'City',
+    'joining_year_ug': 'UG Batch',
+    'joining_year_pg': 'PG Batch',
+    'academic_association': 'Association',
+}
+INT_FACETS = {'joining_year_ug', 'joining_year_pg'}
+
+# Saves touching only these fields can't change any facet or filter result
+_IRRELEVANT_FIELDS = {
+    'user', 'photo', 'photo_available', 'thumbnails_available', 'import_fingerprint', 'updated_at',
+}
+_VERSION_KEY = 'facets:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'FACET_CACHE_ALIAS', 'default')]
+
+
+def _new_version():
+    # Time-based, so a version key lost from the cache can't resurrect old entries
+    return int(time.time() * 1000)
+
+
+def _version():
+    cache = _cache()
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, _new_version(), None)
+        version = cache.get(_VERSION_KEY) or _new_version()
+    return version
+
+
+def invalidate_facets(update_fields=None, statuses=None):
+    """
+    Make every cached facet count stale. Skipped when only irrelevant fields
+    were saved, or when ``statuses`` (the row's status before and after the
+    change) doesn't include 'approved': the directory lists approved rows only.
+    """
+    if update_fields and set(update_fields) <= _IRRELEVANT_FIELDS:
+        return
+    if statuses is not None and 'approved' not in statuses:
+        return
+    cache = _cache()
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, _new_version(), None)
+
+
+def selected_facets(params):
+    """{field: value} of the facet filters present in ``params`` (a QueryDict)."""
+    selected = {}
+    for field in FACETS:
+        value = (params.get(field) or '').strip()
+        if not value:
+            continue
+        if field in INT_FACETS:
+            if not value.isdigit():
+                continue
+            value = int(value)
+        selected[field] = value
+    return selected
+
+
+def apply_facets(queryset, selected):
+    return queryset.filter(**selected) if selected else queryset
+
+
+def _normalize(filters):
+    """
+    Filters that select the same rows map to the same cache key. Only the
+    free-text filters match case-insensitively; facet values are exact
+    filters and go into the key unchanged.
+    """
+    normal = {}
+    for key, value in filters.items():
+        if value in (None, ''):
+            continue
+        if isinstance(value, str) and key not in FACETS:
+            value = ' '.join(value.lower().split())
+        normal[key] = value
+    return normal
+
+
+def _cache_key(filters):
+    raw = json.dumps(_normalize(filters), sort_keys=True, default=str)
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"facets:{_version()}:{digest}"
+
+
+def compute_facets(queryset, limit):
+    """{field: [(value, count), ...]} for the top ``limit`` values of each facet."""
+    queryset = queryset.order_by()
+    counts = {}
+    for field in FACETS:
+        rows = queryset.exclude(**{f"{field}__isnull": True})
+        if field not in INT_FACETS:
+            rows = rows.exclude(**{field: ''})
+        rows = rows.values_list(field).annotate(n=Count('pk')).order_by('-n', field)[:limit]
+        counts[field] = [(value, n) for value, n in rows]
+    return counts
+
+
+def facet_counts(queryset, filters):
+    """Cached compute_facets() for ``queryset``, the result of applying ``filters``."""
+    limit = getattr(settings, 'FACET_LIMIT', 12)
+    key = _cache_key(filters)
+    cache = _cache()
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_facets(queryset, limit)
+        cache.set(key, counts, getattr(settings, 'FACET_CACHE_SECONDS', 600))
+    return counts
+
+
+def facet_panels(counts, params, selected):
+    """Template data: per facet, its values with counts and add/remove links."""
+    panels = []
+    for field, label in FACETS.items():
+        values = []
+        for value, n in counts.get(field, []):
+            query = params.copy()
+            query.pop('cursor', None)
+            is_selected = selected.get(field) == value
+            if is_selected:
+                query.pop(field, None)
+            else:
+                query[field] = value
+            values.append({'value': value, 'count': n, 'selected': is_selected, 'url': '?' + query.urlencode()})
+        if values:
+            panels.append({'field': field, 'label': label, 'values': values})
+    return panels
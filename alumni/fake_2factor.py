@@ -0,0 +1,69 @@
+"""
+Local stand-in for the 2Factor SMS API, for tests and benchmarks.
+
+Answers GET /API/V1/<key>/SMS/<phone>/<otp>[/<template>] with 2Factor's
+JSON shape, optionally adding latency and failures. Nothing leaves the
+machine. Run with `manage.py fake_2factor`, then point
+TWO_FACTOR_BASE_URL at http://127.0.0.1:<port>/API/V1.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_SMS_PATH = re.compile(r"^/API/V1/[^/]*/SMS/(\d+)/(\d+)(?:/[^/]+)?/?$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real gateway
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(random.uniform(0, 2 * server.latency))  # mean = latency
+
+        if not _SMS_PATH.match(self.path):
+            return self._reply(404, {"Status": "Error", "Details": "Invalid API path"})
+        with server.lock:
+            failing = server.fail_next > 0
+            server.fail_next -= failing
+        if failing or random.random() < server.error_rate:
+            return self._reply(503, {"Status": "Error", "Details": "Service unavailable"})
+        with server.lock:
+            server.sent += 1
+        self._reply(200, {"Status": "Success", "Details": str(uuid.uuid4())})
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class Fake2FactorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, fail_next=0):
+        super().__init__((host, port), _Handler)
+        self.latency = latency          # mean seconds added per request
+        self.error_rate = error_rate    # share of requests answered with 503
+        self.fail_next = fail_next      # the next n requests are answered with 503
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/API/V1"
+
+    def start_in_thread(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
@@ -0,0 +1,131 @@
+"""
+Deletes rows nobody will read again so the hot tables stay small:
+
+- expired or used OTPVerification rows (ModelOTPStore),
+- unverified pending registrations abandoned at the OTP step, with their
+  photo and thumbnails,
+- finished background jobs and stale provider-health snapshots.
+
+Deletes run in small primary-key batches, each in its own transaction, so
+no statement holds table locks for long. Used by `manage.py purge_stale`
+and, when PURGE_STALE_INTERVAL is set, periodically by `run_workers`.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Alumni, Job, OTPVerification, ProviderHealth
+from .thumbnails import THUMBNAIL_SIZES, delete_thumbnails, thumbnail_name
+
+logger = logging.getLogger(__name__)
+
+
+def _batched_delete(queryset, batch_size, dry_run=False, pause=0.0):
+    """Delete ``queryset`` a batch of pks at a time; returns the row count."""
+    if dry_run:
+        return queryset.count()
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            queryset.model.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+        if pause:
+            time.sleep(pause)   # let other writers in between batches
+
+
+def _file_size(name):
+    try:
+        return default_storage.size(name) if default_storage.exists(name) else 0
+    except Exception:
+        return 0
+
+
+def stale_otps():
+    now = timezone.now()
+    return OTPVerification.objects.filter(Q(expires_at__lt=now) | Q(is_verified=True))
+
+
+def stale_registrations(max_age_hours=None):
+    """
+    Pending rows that never completed OTP verification and aren't linked to
+    a user. Aged by updated_at: register_view reuses an old pending/rejected
+    row, and the save refreshes updated_at, so a registration in progress
+    on an old row isn't purged under the user.
+    """
+    hours = max_age_hours if max_age_hours is not None else getattr(settings, "PENDING_REGISTRATION_MAX_AGE_HOURS", 48)
+    return Alumni.objects.filter(
+        status='pending', is_verified=False, user__isnull=True,
+        updated_at__lt=timezone.now() - timedelta(hours=hours),
+    )
+
+
+def purge_registrations(queryset, batch_size, dry_run=False, pause=0.0):
+    """Delete rows and their media; returns (rows, bytes)."""
+    rows = reclaimed = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk').only('id', 'photo')[:batch_size])
+        if not batch:
+            return rows, reclaimed
+        last_pk = batch[-1].pk
+        pks = [a.pk for a in batch]
+        photos = {a.photo.name for a in batch if a.photo}
+        # A photo still referenced by a row we keep must stay
+        shared = set(
+            Alumni.objects.filter(photo__in=photos).exclude(pk__in=pks).values_list('photo', flat=True)
+        )
+        orphans = photos - shared
+        for name in orphans:
+            reclaimed += _file_size(name)
+            reclaimed += sum(_file_size(thumbnail_name(name, v)) for v in THUMBNAIL_SIZES)
+        rows += len(batch)
+        if dry_run:
+            continue
+
+        # Rows first: a failed delete must not leave rows pointing at removed files
+        with transaction.atomic():
+            Alumni.objects.filter(pk__in=pks).delete()
+        for name in orphans:
+            try:
+                default_storage.delete(name)
+            except Exception:
+                logger.exception("[purge] could not delete %s", name)
+            delete_thumbnails(name)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_stale(batch_size=500, pending_age_hours=None, dry_run=False, pause=0.0):
+    """Run every purge; returns counts plus bytes of media reclaimed."""
+    started = time.monotonic()
+    now = timezone.now()
+    job_days = getattr(settings, "JOB_RETENTION_DAYS", 7)
+
+    registrations, media_bytes = purge_registrations(
+        stale_registrations(pending_age_hours), batch_size, dry_run, pause
+    )
+    result = {
+        'otps': _batched_delete(stale_otps(), batch_size, dry_run, pause),
+        'registrations': registrations,
+        'media_bytes': media_bytes,
+        'jobs': _batched_delete(
+            Job.objects.filter(status__in=['done', 'failed'], updated_at__lt=now - timedelta(days=job_days)),
+            batch_size, dry_run, pause,
+        ),
+        'provider_health': _batched_delete(
+            ProviderHealth.objects.filter(updated_at__lt=now - timedelta(days=1)), batch_size, dry_run,
+        ),
+        'dry_run': dry_run,
+    }
+    result['seconds'] = round(time.monotonic() - started, 2)
+    logger.info("[purge] %s", result)
+    return result
@@ -0,0 +1,431 @@
+"""
+Set-based import engine for alumni survey exports.
+
+iter_frames() streams xlsx/csv/parquet files in fixed-size chunks and
+normalize_survey_frame() cleans each chunk with column operations
+(usable by any Excel/CSV/API ingest). AlumniImporter then matches rows against
+email/phone keys loaded once into memory (and dedupes within the file),
+writes new rows with bulk_create and, using a per-record content hash
+(import_fingerprint), bulk_updates only records whose survey row changed.
+One transaction per batch. Rows that can't be imported are collected in
+the ImportSummary instead of printed.
+"""
+import os
+import time
+import hashlib
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from .contacts import normalize_email, normalize_phone
+from .facets import invalidate_facets
+from .search import location_key, search_document
+from .stats import recompute_stats
+from .models import Alumni
+
+logger = logging.getLogger(__name__)
+
+# Survey export header -> Alumni field
+SURVEY_COLUMNS = {
+    'Your Name ': 'name',
+    'Email Address': 'email',
+    'Your Contact Number (WhatsApp)': 'contact_number',
+    'Your Contact Number (Alternate)': 'alternate_contact',
+    'Please Specify Your Academic Association With UCMS ': 'academic_association',
+    'Joining Year (UG) ': 'joining_year_ug',
+    'Joining Year (PG) (Select N/A if Not Applicable)': 'joining_year_pg',
+    'Specialty': 'specialty',
+    'Which Country Are You Currently Working In? ': 'country',
+    'Which State/UT Are You Currently Working In (If in India)? \n(Select N/A if Outside India)': 'state',
+    'Which City Are You Currently Working In? \n(If in India)': 'city',
+    'What is Your Current Designation?': 'current_designation',
+    'Please Specify Your Current Work Association': 'current_work_association',
+    'Name of the Associated Hospital/College/Institute\n(Please Mention Full Name)': 'associated_hospital',
+}
+
+TEXT_FIELDS = [
+    'name', 'email', 'specialty', 'country', 'state', 'city',
+    'current_designation', 'current_work_association', 'associated_hospital',
+]
+PHONE_FIELDS = ['contact_number', 'alternate_contact']
+ALUMNI_FIELDS = TEXT_FIELDS + PHONE_FIELDS + ['academic_association', 'joining_year_ug', 'joining_year_pg']
+
+# Same fallback the row-by-row importer always used for a missing UG year
+DEFAULT_JOINING_YEAR_UG = 2000
+
+
+# -------------------------------
+# NORMALIZATION (vectorized)
+# -------------------------------
+def _clean_text(col):
+    """Strip, and blank out NaN / 'nan' / 'None' cells, for a whole column."""
+    s = col.astype('string').str.strip().fillna('')
+    return s.mask(s.str.lower().isin(['nan', 'none', 'nat']), '')
+
+
+def _clean_phone(col):
+    """Phones read as numbers (9560360454.0) become plain digit strings."""
+    return _clean_text(col).str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+
+def _academic_association(col):
+    """Survey text -> academic association choice: 'UG', 'PG' or 'UG_PG'."""
+    s = col.str.upper().str.replace('&', 'AND', regex=False)
+    has_ug = s.str.contains('UG', regex=False)
+    has_pg = s.str.contains('PG', regex=False)
+    both = s.str.contains('BOTH', regex=False) | s.str.contains('UG AND PG', regex=False)
+    choice = np.select([both, has_ug & ~has_pg, has_pg & ~has_ug], ['UG_PG', 'UG', 'PG'], default='UG')
+    return pd.Series(choice, index=col.index, dtype='string')
+
+
+def _year(col):
+    num = pd.to_numeric(col, errors='coerce')
+    num = num.where((num == np.floor(num)) & num.between(1900, 2100))
+    return num.astype('Int64')
+
+
+def normalize_survey_frame(df, columns=SURVEY_COLUMNS):
+    """
+    Return a new DataFrame with one column per ALUMNI_FIELDS entry plus
+    ``reject_reason`` ('' for importable rows). ``columns`` maps source
+    headers to Alumni fields; missing source columns become blanks.
+    """
+    src = df.rename(columns=columns)
+    out = pd.DataFrame(index=df.index)
+    for field in ALUMNI_FIELDS:
+        if field not in src.columns:
+            src[field] = pd.Series(pd.NA, index=df.index, dtype='object')
+
+    for field in TEXT_FIELDS:
+        out[field] = _clean_text(src[field])
+    for field in PHONE_FIELDS:
+        out[field] = _clean_phone(src[field])
+    out['academic_association'] = _academic_association(_clean_text(src['academic_association']))
+    out['joining_year_ug'] = _year(src['joining_year_ug']).fillna(DEFAULT_JOINING_YEAR_UG)
+    out['joining_year_pg'] = _year(src['joining_year_pg'])
+
+    # Trim every text column to its model max_length (avoids DataError on insert)
+    for field in TEXT_FIELDS + PHONE_FIELDS + ['academic_association']:
+        max_length = Alumni._meta.get_field(field).max_length
+        if max_length:
+            out[field] = out[field].str.slice(0, max_length)
+
+    no_name = out['name'] == ''
+    no_contact = (out['email'] == '') & (out['contact_number'] == '')
+    out['reject_reason'] = np.select(
+        [no_name, no_contact], ['missing name', 'missing email and phone'], default=''
+    )
+    return out
+
+
+def iter_alumni_records(frame):
+    """Yield (row_label, alumni_data) for every importable row of a normalized frame."""
+    valid = frame.loc[frame['reject_reason'] == '', ALUMNI_FIELDS]
+    valid = valid.astype(object).where(valid.notna(), None)
+    for label, data in zip(valid.index, valid.to_dict('records')):
+        data['status'] = 'approved'
+        data['is_verified'] = True
+        yield label, data
+
+
+# -------------------------------
+# IMPORT ENGINE
+# -------------------------------
+# Keep the summary bounded on very large files; counts stay exact.
+MAX_REJECT_DETAILS = 1000
+
+# Written by bulk_update when a survey row changed since the last import
+UPDATE_FIELDS = ALUMNI_FIELDS + [
+    'email_normalized', 'phone_e164', 'search_document', 'location_key', 'import_fingerprint', 'updated_at',
+]
+
+
+def row_fingerprint(data):
+    """Stable hash of the importable fields; same value for a file row and its DB record."""
+    parts = ['' if data.get(field) is None else str(data.get(field)) for field in ALUMNI_FIELDS]
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ImportSummary:
+    """Counters and per-row rejects for one import run."""
+
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.updated = 0     # changed since the last import
+        self.adopted = 0     # never-fingerprinted records overwritten (adopt=True)
+        self.unchanged = 0   # same content as the DB record
+        self.skipped = 0     # duplicates, or records edited on the site since import
+        self.unadopted = 0   # of skipped: differ but have no fingerprint; adopt=True would update them
+        self.failed = 0      # invalid rows or DB errors
+        self.rejects = []    # [{'row': ..., 'reason': ...}, ...]
+        self.elapsed = 0.0   # seconds
+
+    def reject(self, row, reason, failed=True):
+        if failed:
+            self.failed += 1
+        else:
+            self.skipped += 1
+        if len(self.rejects) < MAX_REJECT_DETAILS:
+            self.rejects.append({'row': row, 'reason': reason})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'adopted': self.adopted,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'unadopted': self.unadopted,
+            'failed': self.failed,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.total / self.elapsed, 1) if self.elapsed else None,
+            'rejects': self.rejects,
+        }
+
+
+class AlumniImporter:
+    """
+    Feed it (row_number, alumni_data) pairs via add(); call finish() at the end.
+
+    alumni_data is a dict of Alumni field values, already normalized. A row
+    whose email (or else phone) matches an existing record is an upsert:
+
+    - same fingerprint as the record's current content: nothing is written
+      (the first re-sync only stamps import_fingerprint on older imports);
+    - record untouched since its last import: updated with the new values;
+    - record edited on the site since then: skipped, so a survey export
+      never overwrites a profile the alumnus maintains;
+    - record without a fingerprint (imported before fingerprints existed,
+      or registered on the site): skipped and counted as ``unadopted``,
+      unless ``adopt`` is set, which makes the file authoritative for them.
+      Once adopted (and stamped), later runs treat them like any import.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, adopt=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.adopt = adopt
+        self.summary = ImportSummary()
+        self._pending = []   # [(row_number, Alumni)] to insert
+        self._updates = []   # [(row_number, Alumni)] to bulk_update
+        self._adoptions = []  # [(row_number, Alumni)] to bulk_update (adopt=True)
+        self._stamps = []    # [Alumni] needing only import_fingerprint
+        self._seen_emails, self._seen_phones = set(), set()
+        self._matched = set()
+        self._load_existing()
+
+    def _load_existing(self):
+        """One pass over the table: lookup keys plus (stored, current) fingerprints per pk."""
+        self.emails, self.phones, self.fingerprints = {}, {}, {}
+        rows = Alumni.objects.values('pk', 'import_fingerprint', 'email_normalized', 'phone_e164', *ALUMNI_FIELDS)
+        for row in rows.iterator(chunk_size=5000):
+            pk = row['pk']
+            email, phone = row['email_normalized'], row['phone_e164']
+            if email:
+                self.emails.setdefault(email, pk)
+            if phone:
+                self.phones.setdefault(phone, pk)
+            self.fingerprints[pk] = (row['import_fingerprint'], row_fingerprint(row))
+
+    def add(self, row_number, data):
+        self.summary.total += 1
+
+        name = data.get('name') or ''
+        email = (data.get('email') or '').strip()
+        phone = (data.get('contact_number') or '').strip()
+        if not name or (not email and not phone):
+            self.summary.reject(row_number, 'missing name or contact')
+            return
+
+        # Same keys Alumni.save() stores; bulk writes bypass save(), so they're set here
+        keys = {'email_normalized': normalize_email(email), 'phone_e164': normalize_phone(phone)}
+        fields = SimpleNamespace(**data)
+        keys.update(search_document=search_document(fields), location_key=location_key(fields))
+        email_key, phone_key = keys['email_normalized'], keys['phone_e164']
+        if (email_key and email_key in self._seen_emails) or (phone_key and phone_key in self._seen_phones):
+            self.summary.reject(row_number, 'duplicate email/phone in file', failed=False)
+            return
+
+        # Claim the keys now so later rows in the same file dedupe against this one
+        if email_key:
+            self._seen_emails.add(email_key)
+        if phone_key:
+            self._seen_phones.add(phone_key)
+
+        fingerprint = row_fingerprint(data)
+        pk = (email_key and self.emails.get(email_key)) or (phone_key and self.phones.get(phone_key))
+        if not pk:
+            self._pending.append((row_number, Alumni(import_fingerprint=fingerprint, **data, **keys)))
+        else:
+            self._match(row_number, pk, {**data, **keys}, fingerprint)
+        if len(self._pending) + len(self._updates) + len(self._adoptions) + len(self._stamps) >= self.batch_size:
+            self.flush()
+
+    def _match(self, row_number, pk, data, fingerprint):
+        if pk in self._matched:
+            self.summary.reject(row_number, 'duplicate email/phone in file', failed=False)
+            return
+        self._matched.add(pk)
+
+        stored, current = self.fingerprints[pk]
+        if fingerprint == current:
+            self.summary.unchanged += 1
+            if stored != fingerprint:
+                self._stamps.append(Alumni(pk=pk, import_fingerprint=fingerprint))
+        elif stored and stored == current:
+            self._updates.append((row_number, Alumni(
+                pk=pk, import_fingerprint=fingerprint, updated_at=timezone.now(), **data
+            )))
+        elif stored:
+            self.summary.reject(row_number, 'record edited since last import', failed=False)
+        elif self.adopt:
+            self._adoptions.append((row_number, Alumni(
+                pk=pk, import_fingerprint=fingerprint, updated_at=timezone.now(), **data
+            )))
+        else:
+            self.summary.unadopted += 1
+            self.summary.reject(row_number, 'record has no import fingerprint (use adopt to update it)', failed=False)
+
+    def flush(self):
+        batch, self._pending = self._pending, []
+        updates, self._updates = self._updates, []
+        adoptions, self._adoptions = self._adoptions, []
+        stamps, self._stamps = self._stamps, []
+        if self.dry_run:
+            self.summary.inserted += len(batch)
+            self.summary.updated += len(updates)
+            self.summary.adopted += len(adoptions)
+            return
+        if stamps:
+            Alumni.objects.bulk_update(stamps, ['import_fingerprint'])
+        for rows, counter in ((updates, 'updated'), (adoptions, 'adopted')):
+            if rows:
+                self._write(rows, lambda objs: Alumni.objects.bulk_update(objs, UPDATE_FIELDS),
+                            lambda obj: obj.save(update_fields=UPDATE_FIELDS), counter)
+        if batch:
+            self._write(batch, Alumni.objects.bulk_create,
+                        lambda obj: obj.save(force_insert=True), 'inserted')
+
+    def _write(self, batch, write_many, write_one, counter):
+        try:
+            with transaction.atomic():
+                write_many([obj for _, obj in batch])
+            setattr(self.summary, counter, getattr(self.summary, counter) + len(batch))
+        except Exception:
+            # One bad row poisons the whole batch; retry row by row to isolate it
+            logger.warning("[import] batch of %s failed, retrying row by row", len(batch))
+            for row_number, obj in batch:
+                try:
+                    with transaction.atomic():
+                        if counter == 'inserted':
+                            obj.pk = None
+                        write_one(obj)
+                    setattr(self.summary, counter, getattr(self.summary, counter) + 1)
+                except Exception as e:
+                    self.summary.reject(row_number, f'database error: {e}')
+
+    def add_frame(self, frame):
+        """Import a normalize_survey_frame() result; only rejected rows are handled one by one."""
+        rejected = frame.loc[frame['reject_reason'] != '', 'reject_reason']
+        for label, reason in rejected.items():
+            self.summary.total += 1
+            self.summary.reject(label, reason)
+        for label, data in iter_alumni_records(frame):
+            self.add(label, data)
+
+    def finish(self):
+        self.flush()
+        # bulk writes send no signals; cached facet counts and stat counters are stale now
+        if not self.dry_run and (self.summary.inserted or self.summary.updated or self.summary.adopted):
+            invalidate_facets()
+            recompute_stats(expect_drift=True)
+        return self.summary
+
+
+# -------------------------------
+# STREAMING READERS
+# -------------------------------
+FORMATS = ('xlsx', 'csv', 'parquet')
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return 'xlsx' if ext in ('xlsx', 'xlsm') else ext
+
+
+def _xlsx_frames(path, chunk_size):
+    # read_only streams rows from the zip instead of building the whole sheet
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h) if h is not None else '' for h in header]
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=columns)
+    finally:
+        wb.close()
+
+
+def _csv_frames(path, chunk_size):
+    # dtype=str keeps phone numbers as typed (no float round-trip)
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=str)
+
+
+def _parquet_frames(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading parquet needs the optional 'pyarrow' package.")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+def iter_frames(path, fmt=None, chunk_size=5000):
+    """
+    Yield DataFrames of at most ``chunk_size`` source rows. Index labels are
+    the 0-based data row number across the whole file.
+    """
+    fmt = fmt or detect_format(path)
+    readers = {'xlsx': _xlsx_frames, 'csv': _csv_frames, 'parquet': _parquet_frames}
+    if fmt not in readers:
+        raise ValueError(f"Unsupported format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    offset = 0
+    for frame in readers[fmt](path, chunk_size):
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        yield frame
+
+
+def import_alumni_file(path, fmt=None, chunk_size=5000, batch_size=500, dry_run=False, adopt=False, progress=None):
+    """
+    Stream ``path`` through normalization and the import engine.
+
+    ``adopt``: see AlumniImporter. ``progress(rows_done, elapsed_seconds)``
+    is called after every chunk.
+    Returns the ImportSummary; ``summary.elapsed`` holds the wall time.
+    """
+    started = time.monotonic()
+    importer = AlumniImporter(batch_size=batch_size, dry_run=dry_run, adopt=adopt)
+    for frame in iter_frames(path, fmt, chunk_size):
+        importer.add_frame(normalize_survey_frame(frame))
+        if progress:
+            progress(importer.summary.total, time.monotonic() - started)
+    summary = importer.finish()
+    summary.elapsed = time.monotonic() - started
+    return summary
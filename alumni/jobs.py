@@ -0,0 +1,199 @@
+"""
+Durable, DB-backed job queue for work that must not block a request
+(OTP SMS/e-mail delivery, photo thumbnails, notifications).
+
+Views call enqueue(); `manage.py run_workers` claims due jobs and runs
+the handler registered for their kind (several e-mails claimed together
+go out in one batch call). A failed job is retried with exponential
+backoff (plus jitter) until max_attempts, then left as 'failed' with its
+last error, visible in the Django admin.
+
+With JOB_QUEUE_EAGER = True jobs run inline at enqueue time (local dev
+without a worker process).
+"""
+import os
+import random
+import socket
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> dotted path of the callable; it gets the payload as kwargs and
+# must raise to signal a retryable failure.
+JOB_HANDLERS = {
+    'sms_otp': 'alumni.utils.deliver_sms_otp',
+    'email_otp': 'alumni.utils.deliver_email_otp',
+    'thumbnails': 'alumni.thumbnails.make_alumni_thumbnails',
+}
+
+# Payload keys dropped once a job is finished (jobs queued before the OTP
+# handlers read the OTP from the OTP store still carry it)
+SECRET_PAYLOAD_KEYS = ('otp',)
+
+# kind -> callable taking a list of payloads, returning one error (or None)
+# per payload; used when a worker claims several jobs of that kind at once.
+JOB_BATCH_HANDLERS = {
+    'email_otp': 'alumni.utils.deliver_email_otp_batch',
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -------------------------------
+# ENQUEUE
+# -------------------------------
+def enqueue(kind, payload=None, delay=0, expires_at=None, max_attempts=None):
+    """Persist a job and return it; runs it right away when JOB_QUEUE_EAGER is set."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        expires_at=expires_at,
+        max_attempts=max_attempts or _setting("JOB_MAX_ATTEMPTS", 5),
+    )
+    if _setting("JOB_QUEUE_EAGER", False):
+        if claim(job.pk, 'eager'):
+            job.refresh_from_db()
+            run_job(job)
+    return job
+
+
+# -------------------------------
+# CLAIM & RUN
+# -------------------------------
+def claim(pk, worker) -> bool:
+    """Atomically flip one queued job to running; False if another worker got it."""
+    return bool(
+        Job.objects.filter(pk=pk, status='queued').update(
+            status='running', locked_by=worker, locked_at=timezone.now(),
+        )
+    )
+
+
+def claim_due(worker, limit=10):
+    """Claim up to ``limit`` due jobs, oldest first."""
+    now = timezone.now()
+    candidates = (
+        Job.objects
+        .filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = [pk for pk in candidates if claim(pk, worker)]
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'id'))
+
+
+def requeue_stale(timeout=None) -> int:
+    """Jobs left 'running' by a worker that died go back to the queue."""
+    timeout = timeout or _setting("JOB_LOCK_TIMEOUT", 300)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(status='running', locked_at__lt=cutoff).update(
+        status='queued', locked_by='', locked_at=None,
+    )
+
+
+def backoff_seconds(attempts) -> float:
+    """base * 2^(attempts-1), capped, with +/-25% jitter so retries don't stampede."""
+    base = _setting("JOB_RETRY_BASE_SECONDS", 5)
+    cap = _setting("JOB_RETRY_MAX_SECONDS", 300)
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def _scrub(job):
+    """Drop secrets from the payload of a job that will not run again."""
+    for key in SECRET_PAYLOAD_KEYS:
+        job.payload.pop(key, None)
+
+
+def _expired(job, now) -> bool:
+    if job.expires_at and job.expires_at <= now:
+        job.attempts += 1
+        job.status = 'failed'
+        job.last_error = 'expired before delivery'
+        _scrub(job)
+        job.save(update_fields=['status', 'attempts', 'last_error', 'payload', 'updated_at'])
+        return True
+    return False
+
+
+def _record(job, error=None, tb='') -> bool:
+    """Store the outcome of one attempt: done, or requeued with backoff, or failed."""
+    job.attempts += 1
+    if error is None:
+        job.status = 'done'
+        job.last_error = ''
+        _scrub(job)
+        job.save(update_fields=['status', 'attempts', 'last_error', 'payload', 'updated_at'])
+        return True
+
+    job.last_error = f"{error}\n{tb}".strip()
+    if job.attempts >= job.max_attempts:
+        job.status = 'failed'
+        _scrub(job)
+        logger.error("[jobs] %s failed permanently after %s attempts: %s", job, job.attempts, error)
+    else:
+        job.status = 'queued'
+        job.run_after = timezone.now() + timedelta(seconds=backoff_seconds(job.attempts))
+        logger.warning("[jobs] %s attempt %s failed, retrying at %s: %s",
+                       job, job.attempts, job.run_after, error)
+    job.locked_by, job.locked_at = '', None
+    job.save(update_fields=['status', 'attempts', 'run_after', 'last_error',
+                            'locked_by', 'locked_at', 'payload', 'updated_at'])
+    return False
+
+
+def run_job(job) -> bool:
+    """Run a claimed job and record the outcome. Returns True on success."""
+    if _expired(job, timezone.now()):
+        return False
+    try:
+        handler = import_string(JOB_HANDLERS[job.kind])
+        handler(**job.payload)
+    except Exception as e:
+        return _record(job, e, traceback.format_exc(limit=5))
+    return _record(job)
+
+
+def run_jobs(jobs):
+    """
+    Run claimed jobs; kinds with a JOB_BATCH_HANDLERS entry go out in one
+    provider call. Returns the number that succeeded.
+    """
+    now = timezone.now()
+    by_kind = {}
+    for job in jobs:
+        if not _expired(job, now):
+            by_kind.setdefault(job.kind, []).append(job)
+
+    succeeded = 0
+    for kind, group in by_kind.items():
+        if kind not in JOB_BATCH_HANDLERS or len(group) == 1:
+            succeeded += sum(run_job(job) for job in group)
+            continue
+        try:
+            errors = import_string(JOB_BATCH_HANDLERS[kind])([job.payload for job in group])
+        except Exception as e:
+            # The whole call failed (network, auth): every job takes the retry path
+            tb = traceback.format_exc(limit=5)
+            errors = [e] * len(group)
+        else:
+            tb = ''
+        succeeded += sum(_record(job, error, tb) for job, error in zip(group, errors))
+    return succeeded
@@ -0,0 +1,136 @@
+"""
+Mailtrap Email Sending API client.
+
+Like alumni/sms.py: one pooled requests.Session per worker process, built
+on first use, so bursts of OTP mails reuse one TLS connection. send_batch()
+goes through Mailtrap's batch endpoint (up to 500 messages per call).
+"""
+import os
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://send.api.mailtrap.io/api"
+SENDER_NAME = "UCMS Alumni Portal"
+# Mailtrap's limit for /api/batch
+MAX_BATCH = 500
+
+
+class MailtrapError(Exception):
+    """Mailtrap answered, but did not accept the message(s)."""
+
+
+class MailtrapMailer:
+    def __init__(self, token, sender_email, sender_name=SENDER_NAME, base_url=DEFAULT_BASE_URL,
+                 pool_size=10, connect_timeout=3.05, read_timeout=10):
+        self.sender = {"email": sender_email, "name": sender_name}
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {token}"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if sender_email.endswith("demomailtrap.co"):
+            # Helpful warning so you know if you're on Sandbox (captured, not delivered)
+            logger.warning("Mailtrap: DEFAULT_FROM_EMAIL looks like a sandbox sender "
+                           "(demomailtrap.co). Emails may be captured and not delivered in production.")
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            token=settings.MAILTRAP_API_KEY,
+            sender_email=getattr(settings, "DEFAULT_FROM_EMAIL", "hello@demomailtrap.co"),
+            base_url=getattr(settings, "MAILTRAP_BASE_URL", DEFAULT_BASE_URL),
+            pool_size=getattr(settings, "MAILTRAP_POOL_SIZE", 10),
+        )
+
+    def _post(self, path, body):
+        res = self.session.post(f"{self.base_url}/{path}", json=body, timeout=self.timeout)
+        try:
+            payload = res.json()
+        except Exception:
+            payload = {"raw": res.text}
+        if res.status_code != 200 or not payload.get("success"):
+            raise MailtrapError(f"Mailtrap {path}: HTTP={res.status_code}, Payload={payload}")
+        return payload
+
+    def send(self, to, subject, text, html, category=None):
+        """Send one message; returns Mailtrap's payload ({'success', 'message_ids'})."""
+        body = {"from": self.sender, "to": [{"email": to}], "subject": subject, "text": text, "html": html}
+        if category:
+            body["category"] = category
+        return self._post("send", body)
+
+    def send_batch(self, messages, category=None):
+        """
+        ``messages`` is a list of dicts with to/subject/text/html. Returns one
+        error (None on success) per message, in order; raises MailtrapError or
+        a requests exception if a whole call fails.
+        """
+        errors = []
+        for start in range(0, len(messages), MAX_BATCH):
+            chunk = messages[start:start + MAX_BATCH]
+            base = {"from": self.sender}
+            if category:
+                base["category"] = category
+            payload = self._post("batch", {
+                "base": base,
+                "requests": [
+                    {"to": [{"email": m["to"]}], "subject": m["subject"], "text": m["text"], "html": m["html"]}
+                    for m in chunk
+                ],
+            })
+            responses = payload.get("responses") or []
+            for i in range(len(chunk)):
+                item = responses[i] if i < len(responses) else {}
+                errors.append(None if item.get("success") else MailtrapError(str(item.get("errors") or item)))
+        return errors
+
+    def close(self):
+        self.session.close()
+
+
+# -------------------------------
+# PER-PROCESS CLIENT
+# -------------------------------
+_mailer = None
+_mailer_pid = None
+_lock = threading.Lock()
+
+
+def get_mailer():
+    """The process-wide mailer (keyed by pid, see alumni/sms.py:get_sms_client)."""
+    global _mailer, _mailer_pid
+    pid = os.getpid()
+    if _mailer is None or _mailer_pid != pid:
+        with _lock:
+            if _mailer is None or _mailer_pid != pid:
+                _mailer = MailtrapMailer.from_settings()
+                _mailer_pid = pid
+    return _mailer
+
+
+# -------------------------------
+# OTP MESSAGE
+# -------------------------------
+OTP_SUBJECT = "Your OTP - UCMS Alumni Portal"
+OTP_CATEGORY = "OTP Verification"
+
+
+def otp_message(email, otp):
+    """Render the OTP mail; get_template() hits the cached loader, so it is compiled once."""
+    context = {"otp": otp, "minutes": getattr(settings, "OTP_EXPIRY_MINUTES", 5)}
+    return {
+        "to": email,
+        "subject": OTP_SUBJECT,
+        "text": get_template("alumni/emails/otp.txt").render(context).strip(),
+        "html": get_template("alumni/emails/otp.html").render(context),
+    }
@@ -0,0 +1,64 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from alumni.fake_2factor import Fake2FactorServer
+from alumni.sms import TwoFactorClient
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark OTP SMS sends/sec and latency against the fake 2Factor server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', type=float, default=0.02,
+                            help='Mean latency of the fake gateway, seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0)
+        parser.add_argument('--url', help='Gateway base URL (default: start a fake one in-process)')
+
+    def handle(self, *args, **options):
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server = Fake2FactorServer(latency=options['latency'], error_rate=options['error_rate'])
+            base_url = server.start_in_thread().base_url
+
+        client = TwoFactorClient('bench-key', base_url=base_url, pool_size=options['concurrency'])
+        latencies, errors = [], 0
+
+        def send(i):
+            started = time.perf_counter()
+            try:
+                client.send_otp(f'91{9000000000 + i}', '123456')
+                ok = True
+            except Exception:
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for ok, elapsed in pool.map(send, range(options['count'])):
+                latencies.append(elapsed)
+                errors += not ok
+        total = time.perf_counter() - started
+
+        client.close()
+        if server:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(json.dumps({
+            'sent': options['count'] - errors,
+            'errors': errors,
+            'sends_per_second': round(options['count'] / total, 1),
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+            'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+        }, indent=2))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from alumni.fake_2factor import Fake2FactorServer
+
+
+class Command(BaseCommand):
+    help = 'Serve a local fake 2Factor SMS API (no network, for dev and benchmarks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help='Mean added latency per request, seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Share of requests answered with HTTP 503 (0-1)')
+
+    def handle(self, *args, **options):
+        server = Fake2FactorServer(options['host'], options['port'],
+                                   latency=options['latency'], error_rate=options['error_rate'])
+        self.stdout.write(f'Fake 2Factor listening; set TWO_FACTOR_BASE_URL={server.base_url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'{server.sent} messages accepted')
@@ -0,0 +1,59 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from alumni.models import Alumni
+from alumni.thumbnails import generate_thumbnails
+
+
+def _worker_init():
+    # needed under the "spawn" start method; a no-op after fork
+    django.setup()
+
+
+def _render(job):
+    pk, photo_name = job
+    return pk, generate_thumbnails(photo_name)
+
+
+class Command(BaseCommand):
+    help = 'Backfill card/admin/detail thumbnails for existing alumni photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help='Size of the process pool (default: CPU count)')
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate thumbnails that already exist')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        rows = Alumni.objects.filter(photo_available=True).exclude(photo='')
+        if not options['all']:
+            rows = rows.filter(thumbnails_available=False)
+        jobs = list(rows.values_list('id', 'photo'))
+        if not jobs:
+            self.stdout.write('No photos need thumbnails.')
+            return
+
+        self.stdout.write(f"Generating thumbnails for {len(jobs)} photos with {options['workers']} workers...")
+        # Don't hand open DB connections to forked workers; they only touch storage
+        connections.close_all()
+
+        done, failed = [], 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_worker_init) as pool:
+            for pk, ok in pool.map(_render, jobs, chunksize=8):
+                if ok:
+                    done.append(pk)
+                else:
+                    failed += 1
+
+        batch = options['batch_size']
+        for i in range(0, len(done), batch):
+            Alumni.objects.filter(pk__in=done[i:i + batch]).update(thumbnails_available=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated thumbnails for {len(done)} photos ({failed} failed)'
+        ))
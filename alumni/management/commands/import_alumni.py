@@ -1,12 +1,63 @@
-from django.core.management.base import BaseCommand
-from alumni.utils import import_alumni_from_excel
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from alumni.importer import FORMATS, detect_format, import_alumni_file
+
 
 class Command(BaseCommand):
-    help = 'Import alumni data from Excel file'
-    
+    help = 'Import alumni data from an xlsx/csv/parquet survey export (streamed in chunks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=os.path.join('attached_assets', 'alumni_list_1754148285179.xlsx'),
+                            help='Path to the export (relative paths resolve against BASE_DIR)')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Source rows read and normalized per chunk')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per bulk insert / transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Read, normalize and dedupe, but write nothing')
+        parser.add_argument('--adopt', action='store_true',
+                            help='Update matching records that have no import fingerprint (imported before '
+                                 'fingerprints existed, or registered on the site) from the file; '
+                                 'without it they are skipped and counted as "unadopted"')
+
     def handle(self, *args, **options):
-        self.stdout.write('Starting Excel import...')
-        count = import_alumni_from_excel()
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully imported {count} alumni records')
-        )
\ No newline at end of file
+        path = options['file']
+        if not os.path.isabs(path):
+            path = os.path.join(settings.BASE_DIR, path)
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+        fmt = options['format'] or detect_format(path)
+        if fmt not in FORMATS:
+            raise CommandError(f"Can't infer format from '{path}'; pass --format")
+        if options['chunk_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--chunk-size and --batch-size must be positive')
+
+        self.stdout.write(f"Importing {path} ({fmt}){' [dry run]' if options['dry_run'] else ''}...")
+
+        def progress(rows, elapsed):
+            rate = rows / elapsed if elapsed else 0
+            self.stdout.write(f'  {rows} rows processed ({rate:,.0f} rows/sec)')
+
+        try:
+            summary = import_alumni_file(
+                path, fmt,
+                chunk_size=options['chunk_size'],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+                adopt=options['adopt'],
+                progress=progress if options['verbosity'] >= 1 else None,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        result = summary.as_dict()
+        result['dry_run'] = options['dry_run']
+        if options['verbosity'] < 2:
+            result.pop('rejects')
+        self.stdout.write(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from alumni.housekeeping import purge_stale
+
+
+class Command(BaseCommand):
+    help = ('Delete expired/used OTPs, abandoned unverified registrations (with their photos) '
+            'and finished jobs, in small batches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per delete statement / transaction')
+        parser.add_argument('--pending-age-hours', type=int,
+                            help='Age after which unverified pending registrations are removed '
+                                 '(default: PENDING_REGISTRATION_MAX_AGE_HOURS)')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        result = purge_stale(
+            batch_size=options['batch_size'],
+            pending_age_hours=options['pending_age_hours'],
+            dry_run=options['dry_run'],
+            pause=options['pause'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['otps']} OTPs, {result['registrations']} stale registrations "
+            f"({result['media_bytes'] / 1024 / 1024:.1f} MB of media), {result['jobs']} finished jobs, "
+            f"{result['provider_health']} provider-health rows in {result['seconds']}s"
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from alumni.models import Alumni
+from alumni.search import backfill_search_documents
+
+
+class Command(BaseCommand):
+    help = ('Recompute the denormalized search_document / location_key columns '
+            '(after bulk SQL edits or a change to the folding rules)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per read / bulk_update transaction')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        changed = backfill_search_documents(Alumni, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {changed} alumni search documents in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from alumni.search import FTS_TABLE, fts_available, rebuild_sqlite_fts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the alumni full-text search index (SQLite FTS5 shadow table)'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                'No full-text index on this database. Run "migrate" first.'
+            ))
+            return
+
+        if connection.vendor == 'postgresql':
+            # GIN expression indexes are maintained by Postgres itself
+            self.stdout.write('Postgres GIN indexes are maintained automatically; nothing to rebuild.')
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            rebuild_sqlite_fts(cursor)
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+            count = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search index with {count} alumni records'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from alumni.stats import recompute_stats
+
+
+class Command(BaseCommand):
+    help = ('Recount the alumni statistics counters from the Alumni table and repair any drift '
+            '(run nightly, e.g. from cron: 30 2 * * * python manage.py recompute_stats)')
+
+    def handle(self, *args, **options):
+        result = recompute_stats()
+        style = self.style.WARNING if result['drifted'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{result['counters']} counters, {result['drifted']} drifted: {result['corrected']} corrected, "
+            f"{result['created']} created, {result['removed']} removed in {result['seconds']:.2f}s"
+        ))
@@ -0,0 +1,54 @@
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from alumni.models import Alumni
+
+
+class Command(BaseCommand):
+    help = 'Re-check alumni photos against storage and fix the cached photo_available flags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def _stored_names(self, directories):
+        """One listdir per upload directory instead of one exists() per photo."""
+        names = set()
+        for directory in directories:
+            try:
+                _, files = default_storage.listdir(directory)
+            except NotImplementedError:
+                return None
+            except FileNotFoundError:
+                continue
+            names.update(posixpath.join(directory, f) for f in files)
+        return names
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rows = Alumni.objects.exclude(photo__isnull=True).exclude(photo='')
+        directories = {posixpath.dirname(name) for name in rows.values_list('photo', flat=True).distinct()}
+        stored = self._stored_names(directories)
+
+        changed, checked = [], 0
+        for alumni in rows.only('id', 'photo', 'photo_available').iterator(chunk_size=batch_size):
+            checked += 1
+            if stored is not None:
+                exists = alumni.photo.name in stored
+            else:
+                exists = default_storage.exists(alumni.photo.name)
+            if exists != alumni.photo_available:
+                alumni.photo_available = exists
+                changed.append(alumni)
+
+        Alumni.objects.bulk_update(changed, ['photo_available'], batch_size=batch_size)
+        # Rows without a photo can never have one available
+        cleared = Alumni.objects.filter(photo_available=True).filter(
+            photo__isnull=True
+        ).update(photo_available=False)
+        cleared += Alumni.objects.filter(photo_available=True, photo='').update(photo_available=False)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} photos, updated {len(changed) + cleared} flags'
+        ))
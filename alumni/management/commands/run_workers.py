@@ -0,0 +1,85 @@
+import logging
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from alumni.housekeeping import purge_stale
+from alumni.jobs import claim_due, requeue_stale, run_jobs, worker_name
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers (OTP / notification delivery) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Worker threads (jobs are network-bound)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Jobs claimed per poll, per thread')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the jobs that are due now, then exit')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop.set())
+
+        stale = requeue_stale()
+        if stale:
+            self.stdout.write(f'Requeued {stale} jobs left running by a dead worker')
+
+        self.counts = {'done': 0, 'failed': 0}
+        self.lock = threading.Lock()
+        threads = [
+            threading.Thread(target=self.work, args=(f"{worker_name()}/{i}", options), daemon=True)
+            for i in range(max(1, options['concurrency']))
+        ]
+        self.stdout.write(f"Starting {len(threads)} worker threads ({worker_name()})")
+        for t in threads:
+            t.start()
+
+        # Optional housekeeping on the main thread (0 = leave it to cron / purge_stale)
+        purge_interval = getattr(settings, 'PURGE_STALE_INTERVAL', 0)
+        last_sweep = last_purge = time.monotonic()
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=1)
+            now = time.monotonic()
+            if now - last_sweep > 60:
+                requeue_stale()
+                close_old_connections()
+                last_sweep = now
+            if purge_interval and not options['once'] and now - last_purge > purge_interval:
+                try:
+                    purge_stale()
+                except Exception:
+                    logger.exception('[run_workers] purge_stale failed')
+                last_purge = now
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Workers stopped: {self.counts['done']} jobs done, {self.counts['failed']} attempts failed"
+        ))
+
+    def work(self, name, options):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                jobs = claim_due(name, options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        return
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                ok = run_jobs(jobs)
+                with self.lock:
+                    self.counts['done'] += ok
+                    self.counts['failed'] += len(jobs) - ok
+        finally:
+            connection.close()
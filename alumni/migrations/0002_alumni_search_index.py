@@ -0,0 +1,83 @@
+from django.db import migrations
+
+# The DDL is frozen here as it was when this migration was written: the
+# live helpers in alumni.search read columns added by later migrations.
+FTS_TABLE = 'alumni_alumni_fts'
+
+# GET/form param -> columns of its to_tsvector() document
+PG_DOCUMENTS = {
+    'name': ('name',),
+    'specialization': ('specialty',),
+    'location': ('city', 'state', 'country'),
+    'designation': ('current_designation',),
+    'work_association': ('current_work_association',),
+}
+
+
+def pg_document_sql(columns):
+    joined = " || ' ' || ".join(f'coalesce("{col}", \'\')' for col in columns)
+    return f"to_tsvector('simple', {joined})"
+
+
+def fts_values_sql(p):
+    return (
+        f"{p}.name, {p}.specialty, "
+        f"coalesce({p}.city, '') || ' ' || coalesce({p}.state, '') || ' ' || coalesce({p}.country, ''), "
+        f"{p}.current_designation, {p}.current_work_association"
+    )
+
+
+FTS_INSERT = f"INSERT INTO {FTS_TABLE}(rowid, name, specialty, location, designation, work_association)"
+
+FTS_TRIGGERS = {
+    'ai': f"AFTER INSERT ON alumni_alumni BEGIN {FTS_INSERT} VALUES (NEW.id, {fts_values_sql('NEW')}); END",
+    'ad': f"AFTER DELETE ON alumni_alumni BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; END",
+    'au': (
+        f"AFTER UPDATE ON alumni_alumni BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; "
+        f"{FTS_INSERT} VALUES (NEW.id, {fts_values_sql('NEW')}); END"
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            for field, columns in PG_DOCUMENTS.items():
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS alumni_fts_{field}_gin "
+                    f"ON alumni_alumni USING GIN (({pg_document_sql(columns)}))"
+                )
+        elif vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "name, specialty, location, designation, work_association, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            for suffix, body in FTS_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{suffix} {body}")
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"{FTS_INSERT} SELECT a.id, {fts_values_sql('a')} FROM alumni_alumni a")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            for field in PG_DOCUMENTS:
+                cursor.execute(f"DROP INDEX IF EXISTS alumni_fts_{field}_gin")
+        elif vendor == 'sqlite':
+            for suffix in FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
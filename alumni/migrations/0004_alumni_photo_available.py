@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+def assume_existing_photos(apps, schema_editor):
+    # Optimistic start; `manage.py reconcile_photos` corrects it against storage.
+    Alumni = apps.get_model('alumni', 'Alumni')
+    Alumni.objects.exclude(photo__isnull=True).exclude(photo='').update(photo_available=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0003_alumni_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='photo_available',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(assume_existing_photos, migrations.RunPython.noop),
+    ]
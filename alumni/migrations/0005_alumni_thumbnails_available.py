@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0004_alumni_photo_available'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='thumbnails_available',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
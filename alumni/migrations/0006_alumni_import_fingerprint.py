@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0005_alumni_thumbnails_available'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='import_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
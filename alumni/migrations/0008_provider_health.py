@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0007_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderHealth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(max_length=20)),
+                ('provider', models.CharField(max_length=50)),
+                ('worker', models.CharField(max_length=100)),
+                ('stats', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Provider health',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='providerhealth',
+            constraint=models.UniqueConstraint(fields=('channel', 'provider', 'worker'), name='alumni_provider_health_uniq'),
+        ),
+    ]
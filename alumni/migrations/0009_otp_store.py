@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:19
+
+from django.core.management import call_command
+from django.db import migrations, models
+
+
+def create_cache_table(apps, schema_editor):
+    # Table for settings.CACHES when it uses DatabaseCache (no-op otherwise)
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0008_provider_health'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['contact', 'is_verified', 'expires_at'], name='alumni_otp_lookup_idx'),
+        ),
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:25
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0009_otp_store'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='alumni_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(fields=['status', 'name', 'id'], name='alumni_status_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='alumni_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(fields=['contact_number'], name='alumni_contact_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['created_at', 'id'], name='alumni_approved_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumni',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['name', 'id'], name='alumni_approved_name_idx'),
+        ),
+    ]
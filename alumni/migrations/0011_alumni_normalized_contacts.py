@@ -0,0 +1,80 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:26
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+BACKFILL_BATCH = 2000
+
+
+# Frozen copies of alumni.contacts at the time of this migration
+def normalize_email(value):
+    return str(value or '').strip().lower()
+
+
+def normalize_phone(value):
+    raw = str(value or '').strip()
+    digits = re.sub(r'\D', '', raw)
+    country = str(getattr(settings, 'DEFAULT_PHONE_COUNTRY_CODE', '91'))
+    if raw.startswith('00'):
+        digits = digits[2:]
+    elif not raw.startswith('+'):
+        if len(digits) == 11 and digits.startswith('0'):
+            digits = digits[1:]
+        if len(digits) == 10:
+            digits = country + digits
+    if not 8 <= len(digits) <= 15:
+        return ''
+    return '+' + digits
+
+
+def backfill_contact_keys(apps, schema_editor):
+    # Keyset batches, one transaction each, so large tables aren't locked for the whole run
+    Alumni = apps.get_model('alumni', 'Alumni')
+    db = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        batch = list(
+            Alumni.objects.using(db).filter(pk__gt=last_pk).order_by('pk')
+            .only('id', 'email', 'contact_number')[:BACKFILL_BATCH]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for alumni in batch:
+            alumni.email_normalized = normalize_email(alumni.email)
+            alumni.phone_e164 = normalize_phone(alumni.contact_number)
+        with transaction.atomic(using=db):
+            Alumni.objects.using(db).bulk_update(batch, ['email_normalized', 'phone_e164'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('alumni', '0010_alumni_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='alumni',
+            name='phone_e164',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=16),
+        ),
+        migrations.RunPython(backfill_contact_keys, migrations.RunPython.noop),
+        # Lookups now go through the columns above
+        migrations.RemoveIndex(
+            model_name='alumni',
+            name='alumni_email_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='alumni',
+            name='alumni_contact_idx',
+        ),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:29
+
+import re
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+# Frozen copies of the alumni.search folding rules and DDL at the time of
+# this migration; the live helpers may change after it has run.
+BACKFILL_BATCH = 1000
+FTS_TABLE = 'alumni_alumni_fts'
+FTS_INSERT = f"INSERT INTO {FTS_TABLE}(rowid, name, specialty, location, designation, work_association)"
+DOCUMENT_FIELDS = (
+    'name', 'specialty', 'city', 'state', 'country',
+    'current_designation', 'current_work_association',
+)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+OLD_LOCATION = "coalesce({p}.city, '') || ' ' || coalesce({p}.state, '') || ' ' || coalesce({p}.country, '')"
+NEW_LOCATION = "{p}.location_key"
+OLD_PG_LOCATION = "to_tsvector('simple', coalesce(\"city\", '') || ' ' || coalesce(\"state\", '') || ' ' || coalesce(\"country\", ''))"
+NEW_PG_LOCATION = "to_tsvector('simple', coalesce(\"location_key\", ''))"
+
+
+def fold_text(*values):
+    text = unicodedata.normalize('NFKD', ' '.join(str(v) for v in values if v).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(_TOKEN_RE.findall(text))
+
+
+def fts_values_sql(p, location):
+    return (
+        f"{p}.name, {p}.specialty, {location.format(p=p)}, "
+        f"{p}.current_designation, {p}.current_work_association"
+    )
+
+
+def install_fts(cursor, location):
+    for suffix in ('ai', 'ad', 'au'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "name, specialty, location, designation, work_association, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    values = fts_values_sql('NEW', location)
+    cursor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON alumni_alumni BEGIN "
+        f"{FTS_INSERT} VALUES (NEW.id, {values}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON alumni_alumni BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON alumni_alumni BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; {FTS_INSERT} VALUES (NEW.id, {values}); END"
+    )
+    cursor.execute(f"{FTS_INSERT} SELECT a.id, {fts_values_sql('a', location)} FROM alumni_alumni a")
+
+
+def backfill_documents(Alumni, db):
+    last_pk = 0
+    while True:
+        batch = list(
+            Alumni.objects.using(db).filter(pk__gt=last_pk).order_by('pk')
+            .only('id', *DOCUMENT_FIELDS)[:BACKFILL_BATCH]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for alumni in batch:
+            alumni.search_document = fold_text(*(getattr(alumni, f) for f in DOCUMENT_FIELDS))
+            alumni.location_key = fold_text(alumni.city, alumni.state, alumni.country)
+        with transaction.atomic(using=db):
+            Alumni.objects.using(db).bulk_update(batch, ['search_document', 'location_key'])
+
+
+def fill_search_documents(apps, schema_editor):
+    connection = schema_editor.connection
+    backfill_documents(apps.get_model('alumni', 'Alumni'), connection.alias)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # The location index now covers location_key alone
+            cursor.execute("DROP INDEX IF EXISTS alumni_fts_location_gin")
+            cursor.execute(f"CREATE INDEX alumni_fts_location_gin ON alumni_alumni USING GIN (({NEW_PG_LOCATION}))")
+            # Substring / similarity lookups over the whole document (pg_trgm, see 0003)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS alumni_search_document_trgm "
+                "ON alumni_alumni USING GIN (search_document gin_trgm_ops)"
+            )
+        elif connection.vendor == 'sqlite':
+            # Triggers now copy location_key into the FTS location column
+            install_fts(cursor, NEW_LOCATION)
+
+
+def drop_document_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS alumni_search_document_trgm")
+            cursor.execute("DROP INDEX IF EXISTS alumni_fts_location_gin")
+            cursor.execute(f"CREATE INDEX alumni_fts_location_gin ON alumni_alumni USING GIN (({OLD_PG_LOCATION}))")
+        elif connection.vendor == 'sqlite':
+            install_fts(cursor, OLD_LOCATION)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('alumni', '0011_alumni_normalized_contacts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='location_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=302),
+        ),
+        migrations.AddField(
+            model_name='alumni',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, drop_document_indexes),
+    ]
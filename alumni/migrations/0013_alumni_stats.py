@@ -0,0 +1,59 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:32
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Frozen copy of alumni.stats.DIMENSIONS at the time of this migration
+DIMENSIONS = (
+    'joining_year_ug', 'joining_year_pg', 'academic_association',
+    'country', 'state', 'city', 'specialty',
+)
+YEAR_DIMENSIONS = {'joining_year_ug', 'joining_year_pg'}
+
+
+def fill_stats(apps, schema_editor):
+    # Incremental updates assume the counters start out right
+    Alumni = apps.get_model('alumni', 'Alumni')
+    AlumniStat = apps.get_model('alumni', 'AlumniStat')
+    db = schema_editor.connection.alias
+    rows = Alumni.objects.using(db).order_by()
+    counts = {}
+    for row in rows.values('status').annotate(n=Count('pk')):
+        counts[('total', '', row['status'])] = row['n']
+    for dimension in DIMENSIONS:
+        grouped = rows.exclude(**{f"{dimension}__isnull": True})
+        if dimension not in YEAR_DIMENSIONS:
+            grouped = grouped.exclude(**{dimension: ''})
+        for row in grouped.values(dimension, 'status').annotate(n=Count('pk')):
+            key = (dimension, str(row[dimension])[:200], row['status'])
+            counts[key] = counts.get(key, 0) + row['n']
+    AlumniStat.objects.using(db).bulk_create(
+        [AlumniStat(dimension=d, value=v, status=s, count=n) for (d, v, s), n in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0012_alumni_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlumniStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=30)),
+                ('value', models.CharField(blank=True, max_length=200)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='alumnistat',
+            constraint=models.UniqueConstraint(fields=('dimension', 'value', 'status'), name='alumni_stat_uniq'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+# models.py had drifted from 0001_initial before any of these migrations
+# were written: "PG only" registrations leave joining_year_ug empty, and
+# academic_association holds one of three short choices. This migration
+# only records those two model changes.
+ACADEMIC_ASSOCIATION_MAX_LENGTH = 100
+
+
+def check_academic_association_fits(apps, schema_editor):
+    # Shrinking varchar(200) fails on Postgres (and would truncate elsewhere)
+    # if a longer value exists; stop with a clear message instead.
+    from django.db.models.functions import Length
+
+    Alumni = apps.get_model('alumni', 'Alumni')
+    too_long = (
+        Alumni.objects.using(schema_editor.connection.alias)
+        .annotate(n=Length('academic_association'))
+        .filter(n__gt=ACADEMIC_ASSOCIATION_MAX_LENGTH)
+    )
+    count = too_long.count()
+    if count:
+        raise RuntimeError(
+            f"{count} alumni have an academic_association longer than "
+            f"{ACADEMIC_ASSOCIATION_MAX_LENGTH} characters; fix them before migrating"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumni', '0014_otp_cache_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_academic_association_fits, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='alumni',
+            name='academic_association',
+            field=models.CharField(
+                choices=[('UG', 'UG'), ('PG', 'PG'), ('UG_PG', 'UG and PG')],
+                max_length=ACADEMIC_ASSOCIATION_MAX_LENGTH,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='alumni',
+            name='joining_year_ug',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
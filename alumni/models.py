@@ -1,12 +1,17 @@
 
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
-# NEW imports for the safe fallback URL (non-breaking)
+# imports for the safe fallback URL / thumbnails
 from django.core.files.storage import default_storage
 from django.templatetags.static import static
 
+from .contacts import normalize_email, normalize_phone
+from .search import DOCUMENT_FIELDS, location_key, search_document
+from .thumbnails import thumbnail_name
 
 # New: canonical choices used by forms & admin
 ACADEMIC_ASSOC_CHOICES = [
@@ -26,6 +31,14 @@ class Alumni(models.Model):
     # Personal Information
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     photo = models.ImageField(upload_to='alumni_photos/', null=True, blank=True)
+    # Cached "file is really in storage" flag so listings never stat storage.
+    # Set on save, corrected by `manage.py reconcile_photos`.
+    photo_available = models.BooleanField(default=False, editable=False)
+    # card/admin/detail variants exist (see alumni/thumbnails.py)
+    thumbnails_available = models.BooleanField(default=False, editable=False)
+    # Content hash of the survey row this record was last imported from
+    # (see alumni/importer.py); blank for records created on the site.
+    import_fingerprint = models.CharField(max_length=32, blank=True, default='', editable=False)
     name = models.CharField(max_length=200)
     email = models.EmailField()
     
@@ -55,6 +68,12 @@ class Alumni(models.Model):
         message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
     )
     contact_number = models.CharField(validators=[phone_regex], max_length=17)
+    # Lookup keys kept in sync by save() (see alumni/contacts.py); bulk writers set them too
+    email_normalized = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False)
+    phone_e164 = models.CharField(max_length=16, blank=True, default='', db_index=True, editable=False)
+    # Folded search text kept in sync by save() (see alumni/search.py)
+    search_document = models.TextField(blank=True, default='', editable=False)
+    location_key = models.CharField(max_length=302, blank=True, default='', db_index=True, editable=False)
     alternate_contact = models.CharField(validators=[phone_regex], max_length=17, null=True, blank=True)
     
     # Registration Status
@@ -66,25 +85,106 @@ class Alumni(models.Model):
     class Meta:
         verbose_name_plural = "Alumni"
         ordering = ['-created_at']
+        indexes = [
+            # admin lists / pending dedupe: status filter, (created_at, id) keyset order
+            models.Index(fields=['status', 'created_at', 'id'], name='alumni_status_created_idx'),
+            # directory: status filter, (name, id) keyset order
+            models.Index(fields=['status', 'name', 'id'], name='alumni_status_name_idx'),
+            # Smaller copies for the approved-only hot paths (skipped where partial indexes aren't supported)
+            models.Index(fields=['created_at', 'id'], condition=Q(status='approved'), name='alumni_approved_created_idx'),
+            models.Index(fields=['name', 'id'], condition=Q(status='approved'), name='alumni_approved_name_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
-    # NEW: Always-return-a-working-image URL (no DB change)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored photo name, to tell a changed photo from a re-saved one (absent if deferred)
+        if 'photo' in instance.__dict__:
+            instance._loaded_photo = instance.__dict__['photo'] or ''
+        return instance
+
+    def _photo_changed(self):
+        if self._state.adding:
+            return True
+        if 'photo' not in self.__dict__:
+            return False  # deferred and never touched
+        if not hasattr(self, '_loaded_photo'):
+            return True   # stored name unknown
+        return (self.photo.name or '') != str(self._loaded_photo) or not getattr(self.photo, '_committed', True)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        self.email_normalized = normalize_email(self.email)
+        self.phone_e164 = normalize_phone(self.contact_number)
+        if update_fields is not None and {'email', 'contact_number'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'email_normalized', 'phone_e164'}
+            update_fields = kwargs['update_fields']
+        self.search_document = search_document(self)
+        self.location_key = location_key(self)
+        if update_fields is not None and set(DOCUMENT_FIELDS) & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'search_document', 'location_key'}
+            update_fields = kwargs['update_fields']
+        # Only a changed photo resets the flags: a plain re-save must not undo
+        # reconcile_photos marking a missing file unavailable.
+        new_upload = False
+        if (update_fields is None or 'photo' in update_fields) and self._photo_changed():
+            # A photo that was just uploaded (or set) is in storage; a cleared one isn't.
+            new_upload = bool(self.photo) and not getattr(self.photo, '_committed', True)
+            self.photo_available = bool(self.photo)
+            if not self.photo or new_upload:
+                # Cleared, or the old variants no longer match: the 'thumbnails' job sets it again
+                self.thumbnails_available = False
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'photo_available', 'thumbnails_available'}
+        super().save(*args, **kwargs)
+        if 'photo' in self.__dict__:
+            self._loaded_photo = self.photo.name or ''
+
+        # Thumbnails need the stored file name, so they are made after the upload
+        # is written, by the job queue rather than in the request
+        if new_upload:
+            from .jobs import enqueue
+            enqueue('thumbnails', {'alumni_id': self.pk, 'photo': self.photo.name})
+
+    # Always-return-a-working-image URL
     @property
     def safe_photo_url(self) -> str:
         """
-        Use uploaded photo if it physically exists in storage; otherwise
-        return the static default image at alumni/static/images/default.png
-        (referenced as 'images/default.png' via the staticfiles finder).
+        Use uploaded photo if storage had it at last check (photo_available);
+        otherwise return the static default image at
+        alumni/static/images/default.png (referenced as 'images/default.png'
+        via the staticfiles finder). No storage round-trip per call.
         """
         try:
-            if self.photo and default_storage.exists(self.photo.name):
+            if self.photo and self.photo_available:
                 return self.photo.url
         except Exception:
             pass
         return static("images/default.png")
 
+    def _thumbnail_url(self, variant) -> str:
+        if self.photo and self.photo_available and self.thumbnails_available:
+            return default_storage.url(thumbnail_name(self.photo.name, variant))
+        return self.safe_photo_url
+
+    @property
+    def card_photo_url(self) -> str:
+        """160px square for directory cards; falls back to safe_photo_url."""
+        return self._thumbnail_url('card')
+
+    @property
+    def admin_photo_url(self) -> str:
+        """120px square for admin panel cards; falls back to safe_photo_url."""
+        return self._thumbnail_url('admin')
+
+    @property
+    def detail_photo_url(self) -> str:
+        """480px square for the profile/detail page; falls back to safe_photo_url."""
+        return self._thumbnail_url('detail')
+
 
 class OTPVerification(models.Model):
     contact = models.CharField(max_length=50)  # Can be email or phone
@@ -92,6 +192,11 @@ class OTPVerification(models.Model):
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['contact', 'is_verified', 'expires_at'], name='alumni_otp_lookup_idx'),
+        ]
     
     def __str__(self):
         return f"OTP for {self.contact}"
@@ -104,3 +209,78 @@ class AdminUser(models.Model):
     
     def __str__(self):
         return f"Admin: {self.user.username}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work (OTP / notification delivery, thumbnails) run by
+    `manage.py run_workers`. See alumni/jobs.py.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Pointless to deliver after this (e.g. the OTP already expired)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='alumni_job_status_run_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ProviderHealth(models.Model):
+    """Latest stats snapshot of one OTP provider in one process (alumni/otp_backends.py)."""
+    channel = models.CharField(max_length=20)
+    provider = models.CharField(max_length=50)
+    worker = models.CharField(max_length=100)
+    stats = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Provider health"
+        constraints = [
+            models.UniqueConstraint(fields=['channel', 'provider', 'worker'], name='alumni_provider_health_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} ({self.channel}) @ {self.worker}"
+
+
+class AlumniStat(models.Model):
+    """
+    Precomputed count of Alumni rows with ``status`` and ``dimension`` =
+    ``value`` (dimension 'total' has value ''). Kept current by signals and
+    reconciled by `manage.py recompute_stats`; see alumni/stats.py.
+    """
+    dimension = models.CharField(max_length=30)
+    value = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value', 'status'], name='alumni_stat_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.value} [{self.status}]: {self.count}"
@@ -0,0 +1,322 @@
+"""
+Pluggable OTP delivery providers.
+
+OTP_BACKENDS maps a channel ('sms', 'email') to a provider, Django-style:
+
+    OTP_BACKENDS = {
+        "sms": {"BACKEND": "alumni.otp_backends.TwoFactorProvider"},
+        "email": {"BACKEND": "alumni.otp_backends.MailtrapProvider",
+                  "OPTIONS": {"FAILURE_THRESHOLD": 0.5}},
+    }
+
+Every provider keeps rolling latency/error stats and a circuit breaker.
+While the breaker is open, sends fail fast with ProviderUnavailable (no
+network call), and deliver_otp() hands the OTP to the other channel when
+the caller knows an address for it. Each process publishes its stats to
+ProviderHealth rows, which admins read (admin site, /admin-panel/otp-health/).
+"""
+import json
+import os
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = {
+    "sms": {"BACKEND": "alumni.otp_backends.TwoFactorProvider"},
+    "email": {"BACKEND": "alumni.otp_backends.MailtrapProvider"},
+}
+OTHER_CHANNEL = {"sms": "email", "email": "sms"}
+
+# How often a process writes its stats snapshot to ProviderHealth
+HEALTH_PUBLISH_SECONDS = 10
+
+
+class ProviderUnavailable(Exception):
+    """The provider's circuit breaker is open; nothing was sent."""
+
+
+# -------------------------------
+# ROLLING STATS + CIRCUIT BREAKER
+# -------------------------------
+class CircuitBreaker:
+    """
+    closed -> open when, within WINDOW seconds and at least MIN_CALLS calls,
+    the error rate reaches FAILURE_THRESHOLD (or CONSECUTIVE_FAILURES in a
+    row); open -> half_open after COOLDOWN seconds, where one trial call
+    decides between closed and open again.
+    """
+
+    def __init__(self, window=300, min_calls=5, failure_threshold=0.5,
+                 consecutive_failures=5, cooldown=30, max_samples=1000):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.consecutive_limit = consecutive_failures
+        self.cooldown = cooldown
+        self.samples = deque(maxlen=max_samples)   # (monotonic ts, latency s, ok)
+        self.state = "closed"
+        self.opened_at = None
+        self.consecutive = 0
+        self.last_error = ""
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def _trim(self, now):
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = "half_open"
+                self.trial_running = False
+            if self.state == "half_open":
+                if self.trial_running:
+                    return False
+                self.trial_running = True
+            return True
+
+    def record(self, latency, ok, error=""):
+        now = time.monotonic()
+        with self.lock:
+            self.samples.append((now, latency, ok))
+            self._trim(now)
+            self.consecutive = 0 if ok else self.consecutive + 1
+            if not ok:
+                self.last_error = str(error)[:500]
+
+            if self.state == "half_open":
+                self.trial_running = False
+                self._set_state("closed" if ok else "open", now)
+                return
+            calls = len(self.samples)
+            errors = sum(1 for _, _, good in self.samples if not good)
+            if self.state == "closed" and not ok and (
+                self.consecutive >= self.consecutive_limit
+                or (calls >= self.min_calls and errors / calls >= self.failure_threshold)
+            ):
+                self._set_state("open", now)
+
+    def _set_state(self, state, now):
+        if state == "open":
+            self.opened_at = now
+        elif state == "closed":
+            # Start a fresh window so old failures can't re-trip it at once
+            self.samples.clear()
+            self.consecutive = 0
+        if state != self.state:
+            logger.warning("[otp] circuit %s -> %s", self.state, state)
+        self.state = state
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            latencies = sorted(lat for _, lat, _ in self.samples)
+            calls = len(self.samples)
+            errors = sum(1 for _, _, ok in self.samples if not ok)
+            state = self.state
+            if state == "open" and now - self.opened_at >= self.cooldown:
+                state = "half_open"
+
+        def pct(p):
+            return round(latencies[min(calls - 1, int(calls * p))] * 1000, 1) if calls else None
+
+        return {
+            "state": state,
+            "calls": calls,
+            "errors": errors,
+            "error_rate": round(errors / calls, 3) if calls else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "consecutive_failures": self.consecutive,
+            "last_error": self.last_error,
+            "window_seconds": self.window,
+        }
+
+
+# -------------------------------
+# PROVIDERS
+# -------------------------------
+class BaseOTPProvider:
+    """Subclasses implement send(to, otp); send_batch() defaults to a loop."""
+    channel = None
+    name = "base"
+
+    def __init__(self, channel=None, **options):
+        self.channel = channel or self.channel
+        self.breaker = CircuitBreaker(
+            window=options.get("WINDOW_SECONDS", 300),
+            min_calls=options.get("MIN_CALLS", 5),
+            failure_threshold=options.get("FAILURE_THRESHOLD", 0.5),
+            consecutive_failures=options.get("CONSECUTIVE_FAILURES", 5),
+            cooldown=options.get("COOLDOWN_SECONDS", 30),
+        )
+        self._published_at = 0.0
+
+    def send(self, to, otp):
+        raise NotImplementedError
+
+    def send_batch(self, items):
+        """``items`` is a list of (to, otp); returns one error (or None) per item."""
+        errors = []
+        for to, otp in items:
+            try:
+                self.send(to, otp)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def _call(self, func, *args):
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit open")
+        state = self.breaker.state
+        started = time.monotonic()
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.breaker.record(time.monotonic() - started, False, e)
+            self.publish_health(force=self.breaker.state != state)
+            raise
+        self.breaker.record(time.monotonic() - started, True)
+        self.publish_health(force=self.breaker.state != state)
+        return result
+
+    def deliver(self, to, otp):
+        """send() behind the breaker, with latency/error accounting."""
+        return self._call(self.send, to, otp)
+
+    def deliver_batch(self, items):
+        # A batch is one provider call: one sample for the breaker
+        return self._call(self.send_batch, items)
+
+    def publish_health(self, force=False):
+        """Throttled upsert of this process's stats into ProviderHealth."""
+        now = time.monotonic()
+        if not force and now - self._published_at < HEALTH_PUBLISH_SECONDS:
+            return
+        self._published_at = now
+        from .jobs import worker_name
+        from .models import ProviderHealth
+        try:
+            ProviderHealth.objects.update_or_create(
+                channel=self.channel, provider=self.name, worker=worker_name(),
+                defaults={"stats": self.breaker.snapshot(), "updated_at": timezone.now()},
+            )
+        except Exception:
+            logger.exception("[otp] could not publish provider health")
+
+
+class TwoFactorProvider(BaseOTPProvider):
+    channel = "sms"
+    name = "2factor"
+
+    def send(self, to, otp):
+        from .sms import get_sms_client
+        return get_sms_client().send_otp(to, otp)
+
+
+class MailtrapProvider(BaseOTPProvider):
+    channel = "email"
+    name = "mailtrap"
+
+    def send(self, to, otp):
+        from .mailer import OTP_CATEGORY, get_mailer, otp_message
+        return get_mailer().send(category=OTP_CATEGORY, **otp_message(to, otp))
+
+    def send_batch(self, items):
+        from .mailer import OTP_CATEGORY, get_mailer, otp_message
+        return get_mailer().send_batch([otp_message(to, otp) for to, otp in items], category=OTP_CATEGORY)
+
+
+class ConsoleProvider(BaseOTPProvider):
+    """Logs the OTP instead of sending it (local development)."""
+    name = "console"
+
+    def send(self, to, otp):
+        logger.info("[otp:%s] OTP for %s is %s", self.channel, to, otp)
+
+
+class FileProvider(BaseOTPProvider):
+    """Appends one JSON line per OTP to OPTIONS['PATH'] (tests, load runs)."""
+    name = "file"
+
+    def __init__(self, channel=None, **options):
+        super().__init__(channel, **options)
+        self.path = options.get("PATH") or os.path.join(settings.BASE_DIR, "otp_outbox.jsonl")
+        self._write_lock = threading.Lock()
+
+    def send(self, to, otp):
+        line = json.dumps({"channel": self.channel, "to": to, "otp": otp, "at": timezone.now().isoformat()})
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+# -------------------------------
+# REGISTRY & DISPATCH
+# -------------------------------
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(channel):
+    """The configured provider for ``channel``; one instance per process so stats accumulate."""
+    provider = _providers.get(channel)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(channel)
+            if provider is None:
+                config = getattr(settings, "OTP_BACKENDS", DEFAULT_BACKENDS).get(channel)
+                if not config:
+                    raise ValueError(f"No OTP backend configured for channel '{channel}'")
+                cls = import_string(config["BACKEND"])
+                provider = cls(channel=channel, **config.get("OPTIONS", {}))
+                _providers[channel] = provider
+    return provider
+
+
+def reset_providers():
+    with _providers_lock:
+        _providers.clear()
+
+
+def deliver_otp(channel, to, otp, fallback=None):
+    """
+    Send ``otp`` to ``to`` on ``channel``. If that provider's breaker is
+    open or the send fails and ``fallback`` (an address on the other
+    channel) is given, the same OTP goes out there instead. Raises when no
+    route worked, so the job queue retries. Returns the channel used.
+    """
+    try:
+        get_provider(channel).deliver(to, otp)
+        return channel
+    except Exception as e:
+        if not fallback:
+            raise
+        other = OTHER_CHANNEL[channel]
+        logger.warning("[otp] %s delivery to %s failed (%s); falling back to %s", channel, to, e, other)
+        get_provider(other).deliver(fallback, otp)
+        return other
+
+
+def provider_health(max_age=3600):
+    """Latest published stats per provider and worker process (seen in the last ``max_age`` s)."""
+    from .models import ProviderHealth
+    since = timezone.now() - timedelta(seconds=max_age)
+    rows = ProviderHealth.objects.filter(updated_at__gte=since).order_by("channel", "provider", "-updated_at")
+    return [
+        {"channel": r.channel, "provider": r.provider, "worker": r.worker,
+         "updated_at": r.updated_at.isoformat(), **r.stats}
+        for r in rows
+    ]
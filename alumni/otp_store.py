@@ -0,0 +1,135 @@
+"""
+Where live OTPs are kept between send and verify.
+
+OTP_STORE picks the backend:
+
+- CacheOTPStore (default): one cache entry per contact, expiring natively
+  after OTP_EXPIRY_MINUTES; consuming it claims a "used" marker with
+  cache.add() (atomic on the DB cache and Redis) and deletes it. Uses
+  OTP_CACHE_ALIAS, which must be shared by all web processes (DB cache or
+  Redis, not locmem).
+- ModelOTPStore: the OTPVerification table, for deployments that want a
+  persistent audit trail. `manage.py purge_stale` keeps it small.
+
+Both keep at most one live OTP per contact.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OTPVerification
+
+logger = logging.getLogger(__name__)
+
+
+class BaseOTPStore:
+    def issue(self, contact, otp, expires_at):
+        """Replace any live OTP for ``contact``."""
+        raise NotImplementedError
+
+    def check(self, contact, otp) -> bool:
+        """True if ``otp`` is the live, unused OTP for ``contact`` (does not consume it)."""
+        raise NotImplementedError
+
+    def consume(self, contact, otp) -> bool:
+        """check() and, on success, make the OTP unusable."""
+        raise NotImplementedError
+
+    def live_otp(self, contact):
+        """The live, unused OTP for ``contact``, or None (for the delivery jobs)."""
+        raise NotImplementedError
+
+
+class CacheOTPStore(BaseOTPStore):
+    prefix = "otp:"
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, "OTP_CACHE_ALIAS", "default")]
+
+    def _key(self, contact):
+        # Hashed: contacts are PII and may hold characters some cache backends reject
+        return self.prefix + hashlib.sha256(str(contact).strip().lower().encode()).hexdigest()
+
+    def _ttl(self, expires_ts):
+        return max(1, int(expires_ts - timezone.now().timestamp()))
+
+    def issue(self, contact, otp, expires_at):
+        # The nonce tells this issue apart from a reissue of the same OTP
+        entry = {"otp": otp, "expires_at": expires_at.timestamp(), "nonce": secrets.token_hex(8)}
+        self.cache.set(self._key(contact), entry, self._ttl(entry["expires_at"]))
+
+    def _live(self, contact, otp):
+        """The cache entry if ``otp`` is live and unused for ``contact``, else None."""
+        key = self._key(contact)
+        entry = self.cache.get(key)
+        if not entry or not otp:
+            return None
+        # Cache TTLs are whole seconds; honour the exact expiry too
+        if entry["expires_at"] <= timezone.now().timestamp():
+            return None
+        if not hmac.compare_digest(str(entry["otp"]), str(otp)):
+            return None
+        if self.cache.has_key(f"{key}:used:{entry.get('nonce', '')}"):
+            return None
+        return entry
+
+    def check(self, contact, otp):
+        return self._live(contact, otp) is not None
+
+    def consume(self, contact, otp):
+        entry = self._live(contact, otp)
+        if entry is None:
+            return False
+        key = self._key(contact)
+        # Only one of several concurrent verifies gets to add the marker
+        if not self.cache.add(f"{key}:used:{entry.get('nonce', '')}", 1, self._ttl(entry["expires_at"])):
+            return False
+        self.cache.delete(key)
+        return True
+
+    def live_otp(self, contact):
+        entry = self.cache.get(self._key(contact))
+        if not entry or entry["expires_at"] <= timezone.now().timestamp():
+            return None
+        if self.cache.has_key(f"{self._key(contact)}:used:{entry.get('nonce', '')}"):
+            return None
+        return entry["otp"]
+
+
+class ModelOTPStore(BaseOTPStore):
+    """OTPVerification rows; lookups use the (contact, is_verified, expires_at) index."""
+
+    def _live(self, contact, otp):
+        return OTPVerification.objects.filter(
+            contact=contact, otp=otp, is_verified=False, expires_at__gt=timezone.now(),
+        )
+
+    def issue(self, contact, otp, expires_at):
+        # Keep only one live OTP per contact
+        OTPVerification.objects.filter(contact=contact, is_verified=False).delete()
+        OTPVerification.objects.create(contact=contact, otp=otp, expires_at=expires_at, is_verified=False)
+
+    def check(self, contact, otp):
+        return bool(otp) and self._live(contact, otp).exists()
+
+    def consume(self, contact, otp):
+        return bool(otp) and self._live(contact, otp).update(is_verified=True) > 0
+
+    def live_otp(self, contact):
+        return (
+            OTPVerification.objects
+            .filter(contact=contact, is_verified=False, expires_at__gt=timezone.now())
+            .order_by('-created_at').values_list('otp', flat=True).first()
+        )
+
+
+@lru_cache(maxsize=None)
+def get_otp_store() -> BaseOTPStore:
+    return import_string(getattr(settings, "OTP_STORE", "alumni.otp_store.CacheOTPStore"))()
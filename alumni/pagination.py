@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination for the directory and admin search.
+
+Instead of OFFSET, each page continues strictly after the last row of the
+previous one, e.g. ``WHERE (name, id) > (:name, :id) ORDER BY name, id``,
+so the cost of a page does not grow with how deep the client has scrolled.
+"""
+import json
+import base64
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def page_size_from(request, default=None) -> int:
+    """Requested page size clamped to 1..DIRECTORY_MAX_PAGE_SIZE."""
+    default = default or getattr(settings, "DIRECTORY_PAGE_SIZE", 24)
+    cap = getattr(settings, "DIRECTORY_MAX_PAGE_SIZE", 100)
+    try:
+        size = int(request.GET.get('page_size') or default)
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, cap))
+
+
+def _json_default(value):
+    # full isoformat: DjangoJSONEncoder drops microseconds, which would
+    # make created_at cursors skip or repeat rows
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(values, default=_json_default).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor -> list of values, or None if missing/garbled (start from the top)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _field_value(model, name, value):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return value  # annotation such as search_rank
+    if isinstance(field, models.DateTimeField) and isinstance(value, str):
+        return parse_datetime(value)
+    return value
+
+
+def _after(model, ordering, values):
+    """Q() selecting rows strictly after ``values`` in ``ordering``."""
+    q = Q()
+    equal = Q()
+    for key, value in zip(ordering, values):
+        name = key.lstrip('-')
+        op = 'lt' if key.startswith('-') else 'gt'
+        value = _field_value(model, name, value)
+        q |= equal & Q(**{f"{name}__{op}": value})
+        equal &= Q(**{name: value})
+    return q
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=24):
+    """
+    Return (rows, next_cursor) for one page of ``queryset`` ordered by
+    ``ordering``. The last key must be unique (normally 'id' / '-id').
+    next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor)
+    if values and len(values) == len(ordering):
+        queryset = queryset.filter(_after(queryset.model, ordering, values))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key.lstrip('-')) for key in ordering])
+    return rows, next_cursor
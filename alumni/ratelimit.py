@@ -0,0 +1,124 @@
+"""
+Cache-backed token buckets for the endpoints that trigger paid OTP sends.
+
+OTP_RATE_LIMITS holds "<capacity>/<period>" rates (period: s, m, h) for
+three bucket families shared by login, registration and resend:
+
+    'contact'  per phone number / e-mail address
+    'ip'       per client IP
+    'global'   all clients together
+
+A request passes only if every bucket it touches has a token; nothing is
+taken from any bucket when one of them refuses. A decision is two cache
+round-trips (get_many + set_many) however many buckets are involved.
+Concurrent requests may race on the same bucket; the limit is approximate
+by design, which is fine for abuse control.
+"""
+import hashlib
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .contacts import is_email, normalize_email, normalize_phone
+
+DEFAULT_RATES = {
+    'contact': '5/15m',
+    'ip': '20/15m',
+    'global': '300/1m',
+}
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_rate(rate):
+    """'5/15m' -> (capacity 5, period 900 s)."""
+    count, period = rate.split('/')
+    match = re.fullmatch(r'(\d*)([smh])', period.strip())
+    if not match:
+        raise ValueError(f"Bad rate '{rate}'")
+    return int(count), int(match.group(1) or 1) * _PERIODS[match.group(2)]
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or with RATELIMIT_PROXY_COUNT = n behind n trusted proxies,
+    the X-Forwarded-For entry the outermost proxy saw (the client can forge
+    anything left of it).
+    """
+    proxies = getattr(settings, 'RATELIMIT_PROXY_COUNT', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxies and forwarded:
+        hops = [h.strip() for h in forwarded.split(',') if h.strip()]
+        if len(hops) >= proxies:
+            return hops[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _contact_key(contact):
+    # +91 98..., 098..., 98... are one number (see alumni/contacts.py)
+    key = normalize_email(contact) if is_email(contact) else normalize_phone(contact)
+    return key or str(contact or '').strip().lower()
+
+
+class TokenBucketLimiter:
+    prefix = 'rl:'
+
+    def __init__(self, rates=None, cache_alias='default'):
+        configured = rates or getattr(settings, 'OTP_RATE_LIMITS', DEFAULT_RATES)
+        self.rates = {name: parse_rate(rate) for name, rate in configured.items()}
+        self.cache = caches[cache_alias]
+
+    def _key(self, family, ident):
+        digest = hashlib.sha1(str(ident).encode()).hexdigest()[:20]
+        return f"{self.prefix}{family}:{digest}"
+
+    def hit(self, buckets, now=None):
+        """
+        ``buckets`` is a list of (family, identifier). Returns (allowed,
+        retry_after_seconds); on success one token is taken from each bucket.
+        """
+        now = now or time.time()
+        wanted = {self._key(family, ident): self.rates[family]
+                  for family, ident in buckets if family in self.rates}
+        if not wanted:
+            return True, 0
+        state = self.cache.get_many(list(wanted))
+
+        updated, retry_after = {}, 0.0
+        for key, (capacity, period) in wanted.items():
+            refill = capacity / period                     # tokens per second
+            tokens, stamp = state.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * refill)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / refill)
+            updated[key] = (tokens - 1, now)
+
+        if retry_after:
+            return False, math.ceil(retry_after)
+        # A bucket left alone refills completely within its period, so it may expire then
+        self.cache.set_many(updated, timeout=max(period for _, period in wanted.values()))
+        return True, 0
+
+
+_limiter = None
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = TokenBucketLimiter()
+    return _limiter
+
+
+def otp_buckets(request, *contacts):
+    """The buckets an OTP-sending request counts against."""
+    buckets = [('global', 'all'), ('ip', client_ip(request))]
+    buckets += [('contact', _contact_key(c)) for c in contacts if c]
+    return buckets
+
+
+def check_otp_rate(request, *contacts):
+    """(allowed, retry_after) for a request about to send OTPs to ``contacts``."""
+    return get_limiter().hit(otp_buckets(request, *contacts))
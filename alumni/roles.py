@@ -0,0 +1,86 @@
+"""
+Admin role checks without a query per call.
+
+Django's own flags (is_superuser, is_staff) come with request.user. The
+AdminUser part is memoized on the user object, so repeated checks in one
+request are free. Across requests it is cached for ROLE_CACHE_SECONDS in
+ROLE_CACHE_ALIAS, but only when that is not a DatabaseCache: reading the
+cache table costs the same query as reading AdminUser, plus a write on
+every miss. Saving or deleting an AdminUser drops the cached entry (see
+alumni/signals.py).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import caches
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+from .models import AdminUser
+
+_MEMO_ATTR = '_alumni_admin_role'
+# Cached when the user has no AdminUser row (None can't be told from a cache miss)
+_NO_ROLE = 'none'
+
+
+def _cache():
+    """The role cache, or None when it would just be another table to query."""
+    cache = caches[getattr(settings, 'ROLE_CACHE_ALIAS', 'default')]
+    return None if isinstance(cache, BaseDatabaseCache) else cache
+
+
+def _cache_key(user_id):
+    return f"role:{user_id}"
+
+
+def admin_role(user):
+    """'super_admin', 'admin' or 'none', from the user's AdminUser row."""
+    if not getattr(user, 'is_authenticated', False):
+        return _NO_ROLE
+    role = getattr(user, _MEMO_ATTR, None)
+    if role is None:
+        cache = _cache()
+        role = cache.get(_cache_key(user.pk)) if cache is not None else None
+        if role is None:
+            flag = AdminUser.objects.filter(user_id=user.pk).values_list('is_super_admin', flat=True).first()
+            role = _NO_ROLE if flag is None else ('super_admin' if flag else 'admin')
+            if cache is not None:
+                cache.set(_cache_key(user.pk), role, getattr(settings, 'ROLE_CACHE_SECONDS', 300))
+        setattr(user, _MEMO_ATTR, role)
+    return role
+
+
+def invalidate_role(user_id):
+    cache = _cache()
+    if cache is not None:
+        cache.delete(_cache_key(user_id))
+
+
+def is_admin(user):
+    return user.is_superuser or user.is_staff or admin_role(user) != _NO_ROLE
+
+
+def is_super_admin(user):
+    return user.is_superuser or admin_role(user) == 'super_admin'
+
+
+def admin_required(view=None, *, json=False, redirect_to='alumni:login', message='Access denied'):
+    """
+    login_required plus is_admin(). Refused users get a 403 JSON error
+    (``json=True``) or ``message`` flashed and a redirect to ``redirect_to``.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if not is_admin(request.user):
+                if json:
+                    return JsonResponse({'error': message}, status=403)
+                messages.error(request, message)
+                return redirect(redirect_to)
+            return func(request, *args, **kwargs)
+        return login_required(wrapper)
+
+    return decorator(view) if view is not None else decorator
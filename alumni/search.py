@@ -0,0 +1,513 @@
+"""
+Full-text search for the alumni directory and the admin live search.
+
+- Postgres: one GIN expression index per searchable field group over
+  to_tsvector('simple', ...). Postgres maintains them on every write.
+- SQLite : an FTS5 shadow table (alumni_alumni_fts) kept in sync with
+  alumni_alumni by INSERT/UPDATE/DELETE triggers (see migration 0002).
+- Anything else (or a missing FTS table) falls back to icontains.
+
+Name searches are also typo tolerant (Aggarwal/Agarwal/Agrawal): pg_trgm
+word similarity on Postgres, an in-memory trigram index everywhere else.
+
+Alumni.save() also keeps two denormalized, lowercased, accent-folded
+columns: search_document (every searchable field) and location_key
+(city, state, country). The location filter reads location_key alone, and
+search_document is the single input for any ranking/fuzzy layer.
+`manage.py rebuild_search_documents` backfills both.
+"""
+import re
+import json
+import unicodedata
+import time
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'alumni_alumni_fts'
+
+# GET/form param -> Alumni columns it searches
+SEARCH_FIELDS = {
+    'name': ('name',),
+    'specialization': ('specialty',),
+    'location': ('location_key',),
+    'designation': ('current_designation',),
+    'work_association': ('current_work_association',),
+}
+
+# GET/form param -> FTS5 column in the SQLite shadow table
+FTS_COLUMNS = {
+    'name': 'name',
+    'specialization': 'specialty',
+    'location': 'location',
+    'designation': 'designation',
+    'work_association': 'work_association',
+}
+
+# Folded (accent-free) documents: query tokens for these are folded too
+FOLDED_FIELDS = {'location'}
+
+# Alumni columns that make up search_document, in order
+DOCUMENT_FIELDS = (
+    'name', 'specialty', 'city', 'state', 'country',
+    'current_designation', 'current_work_association',
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_fts_ready = None
+
+
+# -------------------------------
+# DENORMALIZED DOCUMENT
+# -------------------------------
+def fold_text(*values) -> str:
+    """'São Paulo,  BRAZIL' -> 'sao paulo brazil': lowercased, accents removed, words single-spaced."""
+    text = unicodedata.normalize('NFKD', ' '.join(str(v) for v in values if v).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(_TOKEN_RE.findall(text))
+
+
+def search_document(alumni) -> str:
+    """``alumni``: an Alumni instance or anything with its attributes."""
+    return fold_text(*(getattr(alumni, f, '') for f in DOCUMENT_FIELDS))
+
+
+def location_key(alumni) -> str:
+    return fold_text(*(getattr(alumni, f, '') for f in ('city', 'state', 'country')))
+
+
+def backfill_search_documents(model, batch_size=1000, using='default'):
+    """
+    Recompute search_document / location_key for every row of ``model``
+    (the Alumni model, or its historical version in a migration) in keyset
+    batches; returns the number of rows changed.
+    """
+    from django.db import transaction
+
+    changed = 0
+    last_pk = 0
+    fields = ('id', 'search_document', 'location_key') + DOCUMENT_FIELDS
+    while True:
+        batch = list(model.objects.using(using).filter(pk__gt=last_pk).order_by('pk').only(*fields)[:batch_size])
+        if not batch:
+            return changed
+        last_pk = batch[-1].pk
+        stale = []
+        for alumni in batch:
+            doc, loc = search_document(alumni), location_key(alumni)
+            if (alumni.search_document, alumni.location_key) != (doc, loc):
+                alumni.search_document, alumni.location_key = doc, loc
+                stale.append(alumni)
+        if stale:
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_update(stale, ['search_document', 'location_key'])
+        changed += len(stale)
+
+
+# -------------------------------
+# SQL HELPERS (shared with migrations)
+# -------------------------------
+def pg_document_sql(field: str) -> str:
+    """to_tsvector() expression for a field group; must match the GIN index exactly."""
+    joined = " || ' ' || ".join(f'coalesce("{col}", \'\')' for col in SEARCH_FIELDS[field])
+    return f"to_tsvector('simple', {joined})"
+
+
+def pg_index_name(field: str) -> str:
+    return f"alumni_fts_{field}_gin"
+
+
+def sqlite_fts_values_sql(prefix: str) -> str:
+    """Column values for the FTS row, read from NEW./OLD. in triggers or a table alias."""
+    p = prefix
+    return (
+        f"{p}.name, {p}.specialty, {p}.location_key, "
+        f"{p}.current_designation, {p}.current_work_association"
+    )
+
+
+_FTS_TRIGGERS = {
+    'ai': (
+        "AFTER INSERT ON alumni_alumni BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, specialty, location, designation, work_association) "
+        f"VALUES (NEW.id, {sqlite_fts_values_sql('NEW')}); END"
+    ),
+    'ad': (
+        "AFTER DELETE ON alumni_alumni BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; END"
+    ),
+    'au': (
+        "AFTER UPDATE ON alumni_alumni BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, specialty, location, designation, work_association) "
+        f"VALUES (NEW.id, {sqlite_fts_values_sql('NEW')}); END"
+    ),
+}
+
+
+def install_sqlite_fts(cursor) -> bool:
+    """
+    Create the FTS5 table and its sync triggers if missing; rebuild the
+    index when anything had to be (re)created. SQLite drops triggers
+    whenever a migration remakes alumni_alumni, so this also runs after
+    every migrate (see signals.py). Returns True if it rebuilt.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    existing = {row[0] for row in cursor.fetchall()}
+    if 'alumni_alumni' not in existing:
+        return False
+    missing = FTS_TABLE not in existing
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, specialty, location, designation, work_association, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    for suffix, body in _FTS_TRIGGERS.items():
+        if f"{FTS_TABLE}_{suffix}" not in existing:
+            missing = True
+            cursor.execute(f"CREATE TRIGGER {FTS_TABLE}_{suffix} {body}")
+    if missing:
+        rebuild_sqlite_fts(cursor)
+    return missing
+
+
+def drop_sqlite_fts(cursor):
+    for suffix in _FTS_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_sqlite_fts(cursor):
+    """Repopulate the FTS5 shadow table from alumni_alumni."""
+    cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, specialty, location, designation, work_association) "
+        f"SELECT a.id, {sqlite_fts_values_sql('a')} FROM alumni_alumni a"
+    )
+
+
+# -------------------------------
+# BACKEND DETECTION
+# -------------------------------
+def fts_available() -> bool:
+    """True when the current DB has a usable full-text index (checked once per process)."""
+    global _fts_ready
+    if _fts_ready is None:
+        try:
+            if connection.vendor == 'postgresql':
+                _fts_ready = True
+            elif connection.vendor == 'sqlite':
+                _fts_ready = FTS_TABLE in connection.introspection.table_names()
+            else:
+                _fts_ready = False
+        except Exception:
+            logger.exception("[search] could not detect full-text support; using icontains")
+            _fts_ready = False
+    return _fts_ready
+
+
+def _tokens(value):
+    return _TOKEN_RE.findall((value or '').lower())
+
+
+# -------------------------------
+# FUZZY NAME MATCHING (trigrams)
+# -------------------------------
+def fuzzy_threshold() -> float:
+    return float(getattr(settings, "FUZZY_NAME_THRESHOLD", 0.3))
+
+
+def fuzzy_enabled() -> bool:
+    return bool(getattr(settings, "FUZZY_NAME_SEARCH", True))
+
+
+def trigrams(word: str) -> frozenset:
+    """pg_trgm-style trigrams: word padded with two leading and one trailing space."""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _jaccard(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def name_similarity(query, name) -> float:
+    """
+    Mean over query words of the best trigram similarity against any word of
+    ``name``. Registered as trgm_word_similarity() on SQLite connections.
+    """
+    q_words = _tokens(query)
+    n_grams = [trigrams(w) for w in _tokens(name)]
+    if not q_words or not n_grams:
+        return 0.0
+    total = 0.0
+    for word in q_words:
+        grams = trigrams(word)
+        total += max(_jaccard(grams, g) for g in n_grams)
+    return total / len(q_words)
+
+
+class NameTrigramIndex:
+    """
+    Inverted trigram index over the distinct words of Alumni.name.
+
+    Lookups work on the (much smaller) word vocabulary first, then map the
+    matching words to alumni ids, so a query touches only a few postings.
+    """
+
+    def __init__(self):
+        self.word_ids = defaultdict(set)      # word -> alumni ids
+        self.gram_words = defaultdict(set)    # trigram -> words
+        self.names = {}                       # alumni id -> indexed words
+        self.built_at = 0.0
+
+    def add(self, pk, name):
+        self.remove(pk)
+        words = set(_tokens(name))
+        self.names[pk] = words
+        for word in words:
+            if word not in self.word_ids:
+                for gram in trigrams(word):
+                    self.gram_words[gram].add(word)
+            self.word_ids[word].add(pk)
+
+    def remove(self, pk):
+        for word in self.names.pop(pk, ()):
+            ids = self.word_ids.get(word)
+            if ids is None:
+                continue
+            ids.discard(pk)
+            if not ids:
+                del self.word_ids[word]
+                for gram in trigrams(word):
+                    self.gram_words[gram].discard(word)
+
+    def similar_words(self, word, threshold):
+        grams = trigrams(word)
+        # A word needs at least ceil(threshold * |grams|) shared trigrams to
+        # reach the threshold, so it must appear in one of the rarest
+        # (|grams| - min_shared + 1) postings. Only those are scanned.
+        min_shared = max(1, int(threshold * len(grams) + 0.999999))
+        ordered = sorted(grams, key=lambda g: len(self.gram_words.get(g, ())))
+        candidates = set()
+        for gram in ordered[:len(grams) - min_shared + 1]:
+            candidates.update(self.gram_words.get(gram, ()))
+        return [w for w in candidates if _jaccard(grams, trigrams(w)) >= threshold]
+
+    def search(self, query, threshold=None):
+        """Alumni ids whose name has a similar word for every query word."""
+        threshold = fuzzy_threshold() if threshold is None else threshold
+        result = None
+        for word in _tokens(query):
+            ids = set()
+            for match in self.similar_words(word, threshold):
+                ids.update(self.word_ids[match])
+            result = ids if result is None else (result & ids)
+            if not result:
+                return set()
+        return result or set()
+
+
+_name_index = None
+_name_index_lock = threading.Lock()   # guards _name_index and _pending
+_name_index_build = threading.Lock()  # one build at a time
+_pending = None                       # (pk, name) updates made while a build runs
+
+
+def _build_name_index() -> NameTrigramIndex:
+    """A fresh index of the approved names (the only rows the directory lists)."""
+    from .models import Alumni
+    index = NameTrigramIndex()
+    rows = Alumni.objects.filter(status='approved').values_list('id', 'name')
+    for pk, name in rows.iterator(chunk_size=5000):
+        index.add(pk, name)
+    index.built_at = time.monotonic()
+    return index
+
+
+def _rebuild_name_index():
+    """Build a new index and swap it in; the caller holds _name_index_build."""
+    global _name_index, _pending
+    with _name_index_lock:
+        _pending = []
+    try:
+        index = _build_name_index()
+    except Exception:
+        with _name_index_lock:
+            _pending = None
+        raise
+    with _name_index_lock:
+        # Saves made during the build are replayed, so none is lost
+        for pk, name in _pending:
+            if name is None:
+                index.remove(pk)
+            else:
+                index.add(pk, name)
+        _name_index, _pending = index, None
+
+
+def refresh_name_index() -> bool:
+    """Rebuild the index unless another thread already is; False if it was."""
+    if not _name_index_build.acquire(blocking=False):
+        return False
+    try:
+        _rebuild_name_index()
+        return True
+    finally:
+        _name_index_build.release()
+
+
+def name_index() -> NameTrigramIndex:
+    """
+    Process-wide name index. The first call builds it; afterwards an index
+    older than FUZZY_INDEX_TTL seconds keeps serving while a background
+    thread builds its replacement, so no request waits for a rebuild.
+    """
+    index = _name_index
+    if index is None:
+        with _name_index_build:
+            if _name_index is None:
+                _rebuild_name_index()
+        return _name_index
+    ttl = int(getattr(settings, "FUZZY_INDEX_TTL", 600))
+    if time.monotonic() - index.built_at > ttl and not _name_index_build.locked():
+        threading.Thread(target=_refresh_in_background, daemon=True).start()
+    return index
+
+
+def _refresh_in_background():
+    try:
+        refresh_name_index()
+    except Exception:
+        logger.exception("[search] could not rebuild the name index")
+    finally:
+        # The thread got its own DB connection
+        connection.close()
+
+
+def update_name_index(pk, name=None):
+    """
+    Keep this worker's index current on save/delete (other workers catch
+    up via TTL). ``name`` None removes the row, e.g. when it is no longer
+    approved.
+    """
+    with _name_index_lock:
+        if _pending is not None:
+            _pending.append((pk, name))
+        if _name_index is None:
+            return
+        if name is None:
+            _name_index.remove(pk)
+        else:
+            _name_index.add(pk, name)
+
+
+# -------------------------------
+# QUERY BUILDERS
+# -------------------------------
+def _icontains_q(field, value):
+    if field in FOLDED_FIELDS:
+        value = fold_text(value) or value
+    q = Q()
+    for col in SEARCH_FIELDS[field]:
+        q |= Q(**{f"{col}__icontains": value})
+    return q
+
+
+def _pg_tsquery(tokens):
+    # prefix match on every token, all tokens required
+    return ' & '.join(f"{t}:*" for t in tokens)
+
+
+def _sqlite_match(terms):
+    # name : ("ram"* AND "kum"*) AND location : ("delhi"*)
+    parts = []
+    for field, tokens in terms.items():
+        inner = ' AND '.join(f'"{t}"*' for t in tokens)
+        parts.append(f"{FTS_COLUMNS[field]} : ({inner})")
+    return ' AND '.join(parts)
+
+
+def apply_text_search(queryset, filters):
+    """
+    Apply the free-text directory filters to an Alumni queryset.
+
+    ``filters`` maps SEARCH_FIELDS keys to user input; blank values are ignored.
+    Returns (queryset, ranked). When ranked is True the queryset is annotated
+    with ``search_rank`` (higher is better) and the caller should order by it.
+    """
+    terms = {}
+    for field in SEARCH_FIELDS:
+        value = (filters.get(field) or '').strip()
+        if not value:
+            continue
+        tokens = _tokens(fold_text(value) if field in FOLDED_FIELDS else value)
+        if tokens and fts_available():
+            terms[field] = tokens
+        else:
+            # punctuation-only input or no FTS backend: keep the old behaviour
+            queryset = queryset.filter(_icontains_q(field, value))
+
+    if not terms:
+        return queryset, False
+
+    name = terms.pop('name', None) if fuzzy_enabled() else None
+    rank_parts, rank_params = [], []
+
+    if connection.vendor == 'postgresql':
+        if name:
+            # prefix match OR every query word is word-similar (pg_trgm <%)
+            doc = pg_document_sql('name')
+            fuzzy = ' AND '.join('%s <%% lower("name")' for _ in name)
+            queryset = queryset.filter(RawSQL(
+                f"({doc} @@ to_tsquery('simple', %s)) OR ({fuzzy})",
+                [_pg_tsquery(name), *name], output_field=BooleanField(),
+            ))
+            rank_parts.append('word_similarity(%s, lower("name"))')
+            rank_params.append(' '.join(name))
+        for field, tokens in terms.items():
+            doc = pg_document_sql(field)
+            tsquery = _pg_tsquery(tokens)
+            queryset = queryset.filter(RawSQL(
+                f"{doc} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField()
+            ))
+            rank_parts.append(f"ts_rank({doc}, to_tsquery('simple', %s))")
+            rank_params.append(tsquery)
+    else:
+        if name:
+            # prefix match OR every query word has a similar word in the name
+            fuzzy_ids = name_index().search(' '.join(name))
+            queryset = queryset.filter(
+                Q(id__in=RawSQL(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                    [_sqlite_match({'name': name})],
+                ))
+                | Q(id__in=RawSQL("SELECT value FROM json_each(%s)", [json.dumps(sorted(fuzzy_ids))]))
+            )
+            rank_parts.append("trgm_word_similarity(%s, alumni_alumni.name)")
+            rank_params.append(' '.join(name))
+        if terms:
+            # Join the FTS table so MATCH runs once and bm25() reads that one
+            # cursor; a per-row subquery re-ran the whole MATCH for every row
+            queryset = queryset.extra(
+                tables=[FTS_TABLE],
+                where=[f"{FTS_TABLE}.rowid = alumni_alumni.id", f"{FTS_TABLE} MATCH %s"],
+                params=[_sqlite_match(terms)],
+            )
+            # bm25() is "lower is better"; negate so both backends sort descending
+            rank_parts.append(f"-bm25({FTS_TABLE})")
+
+    rank_sql = ' + '.join(rank_parts)
+    if connection.vendor == 'postgresql':
+        # ts_rank() is float4; widen so keyset cursors round-trip exactly
+        rank_sql = f"({rank_sql})::double precision"
+    rank = RawSQL(rank_sql, rank_params, output_field=FloatField())
+    return queryset.annotate(search_rank=rank), True
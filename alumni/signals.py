@@ -0,0 +1,104 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+import logging
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, post_migrate
+from django.dispatch import receiver
+
+from .models import Alumni, AdminUser
+from .facets import invalidate_facets
+from .roles import invalidate_role
+from .stats import SKIP, loaded_values, record_change, values_before_delete, values_before_save
+from .search import (
+    FTS_TABLE, fuzzy_threshold, install_sqlite_fts, name_similarity, update_name_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(connection_created)
+def setup_search_functions(sender, connection, **kwargs):
+    """Per-connection hooks the fuzzy name search relies on."""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            'trgm_word_similarity', 2, name_similarity, deterministic=True
+        )
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+                [str(fuzzy_threshold())],
+            )
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    """SQLite table remakes (AlterField etc.) drop the FTS triggers; put them back."""
+    if getattr(sender, 'name', None) != 'alumni':
+        return
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        # Migrated back to an older schema: the live triggers may read columns it lacks
+        columns = {c.name for c in connection.introspection.get_table_description(cursor, Alumni._meta.db_table)}
+        if not {f.column for f in Alumni._meta.concrete_fields} <= columns:
+            return
+        install_sqlite_fts(cursor)
+
+
+@receiver(pre_save, sender=Alumni)
+def alumni_before_save(sender, instance, update_fields=None, **kwargs):
+    try:
+        instance._stats_before = values_before_save(instance, update_fields)
+    except Exception:
+        # Counters are repaired by the nightly recompute; never block the save
+        logger.exception("[stats] could not read alumni %s before save", instance.pk)
+        instance._stats_before = SKIP
+
+
+@receiver(post_save, sender=Alumni)
+def alumni_saved(sender, instance, update_fields=None, **kwargs):
+    # Only approved rows are searchable; anything else leaves the name index
+    update_name_index(instance.pk, instance.name if instance.status == 'approved' else None)
+
+    before = getattr(instance, '_stats_before', SKIP)
+    instance._stats_before = SKIP
+    # SKIP: status wasn't saved, so it didn't change; None: a new row
+    was = instance.status if before is SKIP else (before or {}).get('status')
+    invalidate_facets(update_fields, statuses={was, instance.status})
+    if before is not SKIP:
+        try:
+            record_change(before, loaded_values(instance))
+        except Exception:
+            logger.exception("[stats] could not update counters for alumni %s", instance.pk)
+
+
+@receiver(pre_delete, sender=Alumni)
+def alumni_before_delete(sender, instance, **kwargs):
+    try:
+        instance._stats_before = values_before_delete(instance)
+    except Exception:
+        logger.exception("[stats] could not read alumni %s before delete", instance.pk)
+        instance._stats_before = SKIP
+
+
+@receiver(post_delete, sender=Alumni)
+def alumni_deleted(sender, instance, **kwargs):
+    update_name_index(instance.pk)
+
+    before = getattr(instance, '_stats_before', SKIP)
+    instance._stats_before = SKIP
+    # Status unknown (read failed): invalidate to be safe
+    invalidate_facets(statuses={before['status']} if before and before is not SKIP else None)
+    if before is not SKIP:
+        try:
+            record_change(before, None)
+        except Exception:
+            logger.exception("[stats] could not update counters for deleted alumni %s", instance.pk)
+
+
+@receiver(post_save, sender=AdminUser)
+@receiver(post_delete, sender=AdminUser)
+def admin_user_changed(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
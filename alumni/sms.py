@@ -0,0 +1,137 @@
+"""
+2Factor SMS gateway client.
+
+One pooled requests.Session per worker process (keep-alive, so an OTP send
+doesn't pay a TCP+TLS handshake), bounded retries with jittered backoff and
+separate connect/read timeouts. Use get_sms_client(); never build a client
+per call.
+
+TWO_FACTOR_BASE_URL can point at the fake server in alumni/fake_2factor.py
+for local runs and benchmarks (`manage.py bench_sms`).
+"""
+import os
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://2factor.in/API/V1"
+
+
+class SMSGatewayError(Exception):
+    """The gateway answered, but did not accept the message."""
+
+
+def _retry_policy(retries, backoff):
+    # Connect failures and 429/502/503/504 never reached a handler, so they are
+    # safe to retry; a read timeout might have sent the SMS, so it is not.
+    kwargs = dict(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=backoff, **kwargs)
+    except TypeError:  # urllib3 < 2 has no jitter option
+        return Retry(**kwargs)
+
+
+class TwoFactorClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, template="",
+                 pool_size=10, retries=2, backoff=0.2, connect_timeout=3.05, read_timeout=5):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.template = template
+        self.timeout = (connect_timeout, read_timeout)
+
+        adapter = HTTPAdapter(
+            pool_connections=1,          # one host
+            pool_maxsize=pool_size,      # >= worker threads, or connections get discarded
+            max_retries=_retry_policy(retries, backoff),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            api_key=settings.TWO_FACTOR_API_KEY,
+            base_url=getattr(settings, "TWO_FACTOR_BASE_URL", DEFAULT_BASE_URL),
+            template=getattr(settings, "TWO_FACTOR_TEMPLATE", "").strip(),
+            pool_size=getattr(settings, "TWO_FACTOR_POOL_SIZE", 10),
+            retries=getattr(settings, "TWO_FACTOR_RETRIES", 2),
+            connect_timeout=getattr(settings, "TWO_FACTOR_CONNECT_TIMEOUT", 3.05),
+            read_timeout=getattr(settings, "TWO_FACTOR_READ_TIMEOUT", 5),
+        )
+
+    def otp_url(self, phone, otp):
+        url = f"{self.base_url}/{self.api_key}/SMS/{phone}/{otp}"
+        # Optional DLT template
+        return f"{url}/{self.template}" if self.template else url
+
+    def send_otp(self, phone, otp):
+        """
+        Send ``otp`` to a normalized MSISDN. Returns the gateway payload;
+        raises requests exceptions on transport errors and SMSGatewayError
+        when the gateway rejects the message.
+        """
+        res = self.session.get(self.otp_url(phone, otp), timeout=self.timeout)
+        try:
+            payload = res.json()
+        except Exception:
+            payload = {"raw": res.text}
+
+        # 2Factor typically returns {"Status": "Success", "Details": "..."}
+        status_val = str(payload.get("Status") or payload.get("status") or "").lower()
+        if res.status_code != 200 or status_val != "success":
+            raise SMSGatewayError(
+                f"Failed to send OTP to {phone}, HTTP={res.status_code}, Status={status_val}, Payload={payload}"
+            )
+        return payload
+
+    def close(self):
+        self.session.close()
+
+
+# -------------------------------
+# PER-PROCESS CLIENT
+# -------------------------------
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def get_sms_client():
+    """
+    The process-wide client. Keyed by pid: with `gunicorn --preload` the
+    module is imported before fork, and sockets must not be shared.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = TwoFactorClient.from_settings()
+                _client_pid = pid
+    return _client
+
+
+def reset_sms_client():
+    """Drop the cached client (settings changed, tests, benchmarks)."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,216 @@
+"""
+Alumni statistics kept as counters instead of ad-hoc aggregate queries.
+
+AlumniStat holds one row per (dimension, value, status): how many Alumni
+rows have that status and that value (dimension 'total' counts them all).
+Counters move incrementally:
+
+- a save compares the row's stat fields before and after (pre_save /
+  post_save in signals.py) and applies only the difference, so approving,
+  rejecting or editing a record touches a handful of counters;
+- a delete decrements the row's counters;
+- bulk writes (the importer) send no signals and call
+  recompute_stats(expect_drift=True).
+
+`manage.py recompute_stats` (run nightly) recounts everything and repairs
+any drift. The dashboard and its JSON endpoint only read AlumniStat.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import Alumni, AlumniStat
+
+logger = logging.getLogger(__name__)
+
+# Alumni field -> dashboard label
+DIMENSIONS = {
+    'joining_year_ug': 'UG Batch',
+    'joining_year_pg': 'PG Batch',
+    'academic_association': 'Academic Association',
+    'country': 'Country',
+    'state': 'State',
+    'city': 'City',
+    'specialty': 'Specialty',
+}
+YEAR_DIMENSIONS = {'joining_year_ug', 'joining_year_pg'}
+STATUSES = ('approved', 'pending', 'rejected')
+STAT_FIELDS = ('status',) + tuple(DIMENSIONS)
+
+# Marks a save that can't affect any counter (set by pre_save)
+SKIP = object()
+
+
+def stat_keys(values):
+    """Counter keys (dimension, value, status) a row with ``values`` counts towards."""
+    if not values:
+        return []
+    status = values.get('status') or ''
+    keys = [('total', '', status)]
+    for dimension in DIMENSIONS:
+        value = values.get(dimension)
+        if value not in (None, ''):
+            keys.append((dimension, str(value)[:200], status))
+    return keys
+
+
+def loaded_values(instance):
+    """The instance's stat fields, or None if any of them is deferred."""
+    values = {}
+    for field in STAT_FIELDS:
+        if field not in instance.__dict__:
+            return None
+        values[field] = instance.__dict__[field]
+    return values
+
+
+def values_before_save(instance, update_fields=None):
+    """What the row looked like in the DB before this save (None if new), or SKIP."""
+    if update_fields is not None and not set(update_fields) & set(STAT_FIELDS):
+        return SKIP
+    if instance._state.adding or instance.pk is None:
+        return None
+    return Alumni.objects.filter(pk=instance.pk).values(*STAT_FIELDS).first()
+
+
+def values_before_delete(instance):
+    """The row's stat fields, read from the DB only if the instance has some deferred."""
+    values = loaded_values(instance)
+    if values is None:
+        values = Alumni.objects.filter(pk=instance.pk).values(*STAT_FIELDS).first()
+    return values
+
+
+def apply_deltas(deltas):
+    """Add each non-zero delta to its counter, creating missing counters."""
+    now = timezone.now()
+    for (dimension, value, status), delta in deltas.items():
+        if not delta:
+            continue
+        counter = AlumniStat.objects.filter(dimension=dimension, value=value, status=status)
+        if counter.update(count=F('count') + delta, updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                AlumniStat.objects.create(dimension=dimension, value=value, status=status, count=delta)
+        except IntegrityError:
+            # Created concurrently by another writer
+            counter.update(count=F('count') + delta, updated_at=now)
+
+
+def record_change(before, after):
+    """Move counters from the ``before`` values of a row to its ``after`` values."""
+    deltas = Counter()
+    for key in stat_keys(before):
+        deltas[key] -= 1
+    for key in stat_keys(after):
+        deltas[key] += 1
+    apply_deltas(deltas)
+
+
+# -------------------------------
+# FULL RECOMPUTE
+# -------------------------------
+def compute_counts(queryset=None):
+    """{(dimension, value, status): count} straight from the Alumni table (or ``queryset``)."""
+    rows = (Alumni.objects.all() if queryset is None else queryset).order_by()
+    counts = {}
+    for row in rows.values('status').annotate(n=Count('pk')):
+        counts[('total', '', row['status'])] = row['n']
+    for dimension in DIMENSIONS:
+        grouped = rows.exclude(**{f"{dimension}__isnull": True})
+        if dimension not in YEAR_DIMENSIONS:
+            grouped = grouped.exclude(**{dimension: ''})
+        for row in grouped.values(dimension, 'status').annotate(n=Count('pk')):
+            key = (dimension, str(row[dimension])[:200], row['status'])
+            counts[key] = counts.get(key, 0) + row['n']
+    return counts
+
+
+def recompute_stats(expect_drift=False):
+    """
+    Rewrite the counters from a full recount; returns what had drifted.
+    Drift is logged as a warning unless ``expect_drift`` (the caller just
+    made bulk writes that bypass the signals).
+    """
+    started = time.monotonic()
+    with transaction.atomic():
+        # Lock the counters first so incremental updates wait for the rewrite
+        existing = {(s.dimension, s.value, s.status): s for s in AlumniStat.objects.select_for_update()}
+        fresh = compute_counts()
+
+        changed, created = [], []
+        for key, count in fresh.items():
+            stat = existing.get(key)
+            if stat is None:
+                created.append(AlumniStat(dimension=key[0], value=key[1], status=key[2], count=count))
+            elif stat.count != count:
+                stat.count = count
+                changed.append(stat)
+        stale = [stat for key, stat in existing.items() if key not in fresh]
+
+        now = timezone.now()
+        for stat in changed:
+            stat.updated_at = now
+        AlumniStat.objects.bulk_update(changed, ['count', 'updated_at'], batch_size=500)
+        AlumniStat.objects.bulk_create(created, batch_size=500)
+        AlumniStat.objects.filter(pk__in=[stat.pk for stat in stale]).delete()
+
+    result = {
+        'counters': len(fresh),
+        'corrected': len(changed),
+        'created': len(created),
+        # Counters decremented to zero are just tidied away; non-zero ones had drifted
+        'removed': len(stale),
+        'drifted': len(changed) + len(created) + sum(1 for stat in stale if stat.count),
+        'seconds': round(time.monotonic() - started, 2),
+    }
+    if result['drifted'] and not expect_drift:
+        logger.warning("[stats] counters had drifted: %s", result)
+    return result
+
+
+# -------------------------------
+# READ SIDE
+# -------------------------------
+def stats_summary(limit=None):
+    """
+    Dashboard data, read from AlumniStat only: totals per status and, per
+    dimension, one row per value with counts per status (batches newest
+    first, everything else by approved count). ``limit`` caps the rows
+    per dimension.
+    """
+    totals = dict.fromkeys(STATUSES, 0)
+    by_dimension = defaultdict(lambda: defaultdict(lambda: dict.fromkeys(STATUSES, 0)))
+    stats = AlumniStat.objects.filter(count__gt=0)
+    for dimension, value, status, count in stats.values_list('dimension', 'value', 'status', 'count'):
+        if dimension == 'total':
+            totals[status] = totals.get(status, 0) + count
+        elif dimension in DIMENSIONS:
+            by_dimension[dimension][value][status] = count
+
+    dimensions = []
+    for dimension, label in DIMENSIONS.items():
+        rows = [
+            {'value': value, **counts, 'total': sum(counts.values())}
+            for value, counts in by_dimension[dimension].items()
+        ]
+        if dimension in YEAR_DIMENSIONS:
+            rows.sort(key=lambda r: int(r['value']) if r['value'].isdigit() else 0, reverse=True)
+        else:
+            rows.sort(key=lambda r: (-r.get('approved', 0), -r['total'], r['value']))
+        dimensions.append({
+            'dimension': dimension, 'label': label, 'distinct': len(rows),
+            'rows': rows[:limit] if limit else rows,
+        })
+
+    updated_at = stats.aggregate(at=Max('updated_at'))['at']
+    return {
+        'totals': {**totals, 'all': sum(totals.values())},
+        'dimensions': dimensions,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
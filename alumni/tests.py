@@ -0,0 +1,732 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import ratelimit, search
+from .accounts import resolve_login
+from .contacts import contact_q
+from .fake_2factor import Fake2FactorServer
+from .facets import _cache_key as facet_cache_key, _version as facets_version
+from .housekeeping import stale_registrations
+from .importer import ALUMNI_FIELDS, AlumniImporter
+from .jobs import claim, claim_due, enqueue, requeue_stale, run_jobs
+from .models import Alumni, AdminUser, AlumniStat, Job
+from .otp_store import CacheOTPStore, ModelOTPStore
+from .ratelimit import TokenBucketLimiter
+from .roles import admin_role
+from .sms import SMSGatewayError, TwoFactorClient
+from .thumbnails import thumbnail_name
+from .stats import compute_counts, recompute_stats
+from .utils import send_email_otp, send_sms_otp, verify_otp
+from .views import latest_pending_ids
+
+
+def failing_handler(**payload):
+    raise RuntimeError('provider down')
+
+
+def succeeding_handler(**payload):
+    pass
+
+
+def make_alumni(**fields):
+    values = {
+        'name': 'Asha Rao',
+        'email': 'asha@example.com',
+        'contact_number': '9876543210',
+        'academic_association': 'UG',
+        'joining_year_ug': 2010,
+        'specialty': 'Medicine',
+        'country': 'India',
+        'state': 'Delhi',
+        'city': 'New Delhi',
+        'current_work_association': 'AIIMS',
+        'current_designation': 'Resident',
+        'associated_hospital': 'AIIMS',
+    }
+    values.update(fields)
+    return Alumni.objects.create(**values)
+
+
+class StatsCounterTests(TestCase):
+    """Counters moved by the signals must equal a full recount."""
+
+    def assertCountersMatch(self):
+        counters = {
+            (s.dimension, s.value, s.status): s.count
+            for s in AlumniStat.objects.exclude(count=0)
+        }
+        self.assertEqual(counters, compute_counts())
+
+    def test_create(self):
+        make_alumni()
+        make_alumni(email='b@example.com', contact_number='9876543211', city='Pune', status='approved')
+        self.assertCountersMatch()
+        self.assertEqual(AlumniStat.objects.get(dimension='city', value='Pune', status='approved').count, 1)
+
+    def test_status_change(self):
+        alumni = make_alumni()
+        alumni.status = 'approved'
+        alumni.save()
+        self.assertCountersMatch()
+        self.assertEqual(AlumniStat.objects.get(dimension='total', status='pending').count, 0)
+        self.assertEqual(AlumniStat.objects.get(dimension='total', status='approved').count, 1)
+
+    def test_edit_and_partial_save(self):
+        alumni = make_alumni(status='approved')
+        alumni.city = 'Mumbai'
+        alumni.joining_year_ug = None
+        alumni.save()
+        alumni.status = 'rejected'
+        alumni.save(update_fields=['status'])
+        self.assertCountersMatch()
+
+    def test_delete(self):
+        kept = make_alumni(status='approved')
+        make_alumni(email='b@example.com', contact_number='9876543211').delete()
+        Alumni.objects.only('id').get(pk=kept.pk).delete()
+        self.assertCountersMatch()
+        self.assertFalse(AlumniStat.objects.exclude(count=0).exists())
+
+    def test_recompute_after_bulk_write(self):
+        make_alumni()
+        Alumni.objects.update(status='approved')  # no signals
+        with self.assertLogs('alumni.stats', 'WARNING'):
+            self.assertTrue(recompute_stats()['drifted'])
+        self.assertCountersMatch()
+
+        Alumni.objects.update(status='rejected')
+        with self.assertNoLogs('alumni.stats', 'WARNING'):
+            recompute_stats(expect_drift=True)
+        self.assertCountersMatch()
+
+
+class ResolveLoginQueryTests(TestCase):
+    """
+    Query budget of resolve_login(). Inside a TestCase its transaction is a
+    savepoint, which adds SAVEPOINT + RELEASE to every count.
+    """
+
+    def test_already_linked(self):
+        user = User.objects.create(username='asha@example.com')
+        alumni = make_alumni(user=user)
+        with self.assertNumQueries(2 + 1):  # candidate alumni (with user)
+            self.assertEqual(resolve_login('asha@example.com'), (alumni.pk, user))
+        with self.assertNumQueries(2 + 1):
+            self.assertEqual(resolve_login('+91 98765 43210', alumni.pk), (alumni.pk, user))
+
+    def test_link_existing_user(self):
+        user = User.objects.create(username='asha@example.com')
+        alumni = make_alumni()
+        with self.assertNumQueries(2 + 3):  # candidate alumni, candidate users, link
+            self.assertEqual(resolve_login('asha@example.com'), (alumni.pk, user))
+        alumni.refresh_from_db()
+        self.assertEqual(alumni.user, user)
+
+    def test_create_user(self):
+        alumni = make_alumni()
+        User.objects.create(username='someone@example.com')
+        with self.assertNumQueries(2 + 4):  # candidate alumni, candidate users, new user, link
+            alumni_id, user = resolve_login('asha@example.com')
+        self.assertEqual(alumni_id, alumni.pk)
+        self.assertEqual(user.username, 'asha@example.com')
+        self.assertEqual(Alumni.objects.get(user=user).pk, alumni.pk)
+
+    def test_no_match(self):
+        make_alumni()
+        with self.assertNumQueries(2 + 1):
+            self.assertEqual(resolve_login('nobody@example.com'), (None, None))
+
+
+class IndexUsageTests(TestCase):
+    """The hot Alumni queries must be answered from the indexes of migrations 0010/0011."""
+
+    def setUp(self):
+        for i in range(20):
+            make_alumni(email=f'a{i}@example.com', contact_number=f'98765432{i:02}',
+                        status=('approved', 'pending', 'rejected')[i % 3])
+        if connection.vendor == 'postgresql':
+            # A tiny table is cheaper to scan; make the planner show whether an index fits
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def index_on(self, *columns):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Alumni._meta.db_table)
+        return next(
+            name for name, info in constraints.items()
+            if info['index'] and info['columns'] == list(columns)
+        )
+
+    def assertUsesIndex(self, queryset, *indexes):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in indexes), f"none of {indexes} in:\n{plan}")
+        return plan
+
+    def test_status_listings(self):
+        for status in ('pending', 'approved'):
+            plan = self.assertUsesIndex(
+                Alumni.objects.filter(status=status).order_by('-created_at', '-id')[:25],
+                'alumni_status_created_idx', 'alumni_approved_created_idx',
+            )
+            # The index supplies the order too: no sort step
+            self.assertNotIn('TEMP B-TREE', plan)
+        self.assertUsesIndex(
+            Alumni.objects.filter(status='approved').order_by('name', 'id')[:25],
+            'alumni_status_name_idx', 'alumni_approved_name_idx',
+        )
+
+    def test_contact_lookups(self):
+        self.assertUsesIndex(
+            Alumni.objects.filter(contact_q('A3@Example.com ')), self.index_on('email_normalized'),
+        )
+        self.assertUsesIndex(
+            Alumni.objects.filter(contact_q('+91 98765 43203')), self.index_on('phone_e164'),
+        )
+
+
+class StaleRegistrationTests(TestCase):
+
+    def setUp(self):
+        self.abandoned = make_alumni()
+        long_ago = timezone.now() - timedelta(days=90)
+        Alumni.objects.update(created_at=long_ago, updated_at=long_ago)
+
+    def test_abandoned_row_is_stale(self):
+        self.assertEqual(list(stale_registrations(48)), [self.abandoned])
+
+    def test_reused_row_is_not_stale(self):
+        # register_view saves the re-submitted form onto the existing row
+        alumni = Alumni.objects.get(pk=self.abandoned.pk)
+        alumni.city = 'Pune'
+        alumni.save()
+        self.assertFalse(stale_registrations(48).exists())
+        self.assertLess(alumni.created_at, timezone.now() - timedelta(hours=48))
+
+    def test_verified_row_is_kept(self):
+        Alumni.objects.update(is_verified=True)
+        self.assertFalse(stale_registrations(48).exists())
+
+
+class LatestPendingTests(TestCase):
+
+    def test_newest_pending_per_contact(self):
+        older = make_alumni()
+        newer = make_alumni(email=' ASHA@example.com', contact_number='+919876543210')  # same contact
+        other = make_alumni(email='ravi@example.com', contact_number='9123456780')
+        make_alumni(email='ravi@example.com', contact_number='9123456780', status='approved')
+        Alumni.objects.filter(pk=older.pk).update(created_at=newer.created_at)  # tie: higher id wins
+
+        ids = set(Alumni.objects.filter(id__in=latest_pending_ids()).values_list('id', flat=True))
+        self.assertEqual(ids, {newer.pk, other.pk})
+
+
+class ImportAdoptTests(TestCase):
+    """Records without an import fingerprint are only overwritten when adopting."""
+
+    def setUp(self):
+        self.alumni = make_alumni(status='approved', is_verified=True)  # e.g. imported before fingerprints
+
+    def run_import(self, adopt=False, **changes):
+        data = {field: getattr(self.alumni, field) for field in ALUMNI_FIELDS}
+        data.update(status='approved', is_verified=True, **changes)
+        importer = AlumniImporter(adopt=adopt)
+        importer.add(0, data)
+        return importer.finish()
+
+    def test_skipped_without_adopt(self):
+        summary = self.run_import(city='Pune')
+        self.assertEqual((summary.updated, summary.adopted, summary.unadopted), (0, 0, 1))
+        self.alumni.refresh_from_db()
+        self.assertEqual(self.alumni.city, 'New Delhi')
+
+    def test_adopt_updates_and_stamps(self):
+        summary = self.run_import(adopt=True, city='Pune')
+        self.assertEqual((summary.adopted, summary.unadopted), (1, 0))
+        self.alumni.refresh_from_db()
+        self.assertEqual(self.alumni.city, 'Pune')
+        self.assertTrue(self.alumni.import_fingerprint)
+
+        # Now fingerprinted: the next correction is an ordinary update
+        summary = self.run_import(city='Mumbai')
+        self.assertEqual((summary.updated, summary.adopted), (1, 0))
+        self.alumni.refresh_from_db()
+        self.assertEqual(self.alumni.city, 'Mumbai')
+
+
+class PhotoAvailableTests(TestCase):
+    """photo_available follows photo changes only, not every save."""
+
+    def setUp(self):
+        alumni = make_alumni(photo='alumni_photos/asha.jpg')
+        self.assertTrue(alumni.photo_available)
+        Alumni.objects.filter(pk=alumni.pk).update(photo_available=False)  # as reconcile_photos does
+        self.alumni = Alumni.objects.get(pk=alumni.pk)
+
+    def test_resave_keeps_reconciled_flag(self):
+        self.alumni.city = 'Pune'
+        self.alumni.save()
+        self.alumni.save(update_fields=['photo'])
+        self.assertFalse(Alumni.objects.get(pk=self.alumni.pk).photo_available)
+
+    def test_new_photo(self):
+        self.alumni.photo = 'alumni_photos/asha-2.jpg'
+        self.alumni.save()
+        self.assertTrue(Alumni.objects.get(pk=self.alumni.pk).photo_available)
+
+    def test_cleared_photo(self):
+        Alumni.objects.filter(pk=self.alumni.pk).update(photo_available=True, thumbnails_available=True)
+        alumni = Alumni.objects.get(pk=self.alumni.pk)
+        alumni.photo = None
+        alumni.save()
+        alumni = Alumni.objects.get(pk=self.alumni.pk)
+        self.assertEqual((alumni.photo_available, alumni.thumbnails_available), (False, False))
+
+
+class FacetInvalidationTests(TestCase):
+    """Only changes that touch the approved set evict the cached facet counts."""
+
+    def assertBumps(self, bumped, change):
+        before = facets_version()
+        change()
+        self.assertEqual(facets_version() != before, bumped)
+
+    def test_pending_registrations_keep_the_cache(self):
+        alumni = make_alumni()
+        self.assertBumps(False, lambda: make_alumni(email='b@example.com', contact_number='9876543211'))
+        alumni.city = 'Pune'
+        self.assertBumps(False, alumni.save)
+        self.assertBumps(False, alumni.delete)
+
+    def test_approved_changes_evict(self):
+        alumni = make_alumni()
+        alumni.status = 'approved'
+        self.assertBumps(True, alumni.save)
+        alumni.city = 'Pune'
+        self.assertBumps(True, alumni.save)
+        alumni.status = 'rejected'
+        self.assertBumps(True, lambda: alumni.save(update_fields=['status']))
+        approved = make_alumni(email='b@example.com', contact_number='9876543211', status='approved')
+        self.assertBumps(True, approved.delete)
+
+    def test_irrelevant_fields_keep_the_cache(self):
+        alumni = make_alumni(status='approved')
+        self.assertBumps(False, lambda: alumni.save(update_fields=['photo_available']))
+
+
+class FacetCacheKeyTests(TestCase):
+
+    def test_free_text_is_case_folded(self):
+        self.assertEqual(facet_cache_key({'name': ' Asha  Rao'}), facet_cache_key({'name': 'asha rao', 'location': ''}))
+
+    def test_facet_values_are_exact(self):
+        # ?city=pune matches no 'Pune' rows: its counts differ
+        self.assertNotEqual(facet_cache_key({'city': 'Pune'}), facet_cache_key({'city': 'pune'}))
+
+
+# The default alias as a small, busy cache: every write past MAX_ENTRIES culls
+SMALL_DEFAULT_CACHE = {
+    **settings.CACHES,
+    'default': {**settings.CACHES['default'], 'OPTIONS': {'MAX_ENTRIES': 20}},
+}
+
+
+@override_settings(CACHES=SMALL_DEFAULT_CACHE)
+class OTPCacheIsolationTests(TestCase):
+    """Culling the shared cache must not drop live OTPs."""
+
+    def test_live_otp_survives_burst(self):
+        store = CacheOTPStore()
+        expires_at = timezone.now() + timedelta(minutes=5)
+        store.issue('asha@example.com', '123456', expires_at)
+        for i in range(200):
+            # rate-limit buckets, facet counts and roles
+            caches['default'].set(f'burst:{i}', i, 300)
+            store.issue(f'user{i}@example.com', '654321', expires_at)
+        self.assertTrue(store.check('asha@example.com', '123456'))
+        self.assertTrue(store.check('user0@example.com', '654321'))
+
+
+class OTPStoreTests:
+    """Behaviour both OTP stores share; mixed into one TestCase per store."""
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.expires_at = timezone.now() + timedelta(minutes=5)
+
+    def test_issue_check_consume(self):
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        self.assertFalse(self.store.check('asha@example.com', '000000'))
+        self.assertFalse(self.store.check('ravi@example.com', '123456'))
+        self.assertTrue(self.store.check('asha@example.com', '123456'))
+        self.assertTrue(self.store.check('asha@example.com', '123456'))  # check does not consume
+        self.assertTrue(self.store.consume('asha@example.com', '123456'))
+
+    def test_single_use(self):
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        self.assertTrue(self.store.consume('asha@example.com', '123456'))
+        self.assertFalse(self.store.check('asha@example.com', '123456'))
+        self.assertFalse(self.store.consume('asha@example.com', '123456'))
+
+    def test_expiry(self):
+        self.store.issue('asha@example.com', '123456', timezone.now() - timedelta(seconds=1))
+        self.assertFalse(self.store.check('asha@example.com', '123456'))
+        self.assertFalse(self.store.consume('asha@example.com', '123456'))
+
+    def test_reissue_replaces(self):
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        self.store.issue('asha@example.com', '654321', self.expires_at)
+        self.assertFalse(self.store.consume('asha@example.com', '123456'))
+        self.assertTrue(self.store.consume('asha@example.com', '654321'))
+
+    def test_reissue_of_same_otp_is_usable(self):
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        self.assertTrue(self.store.consume('asha@example.com', '123456'))
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        self.assertTrue(self.store.consume('asha@example.com', '123456'))
+
+
+class CacheOTPStoreTests(OTPStoreTests, TestCase):
+
+    def make_store(self):
+        return CacheOTPStore()
+
+    def test_concurrent_consume(self):
+        self.store.issue('asha@example.com', '123456', self.expires_at)
+        # Both requests read the entry before either deletes it
+        with mock.patch.object(self.store.cache, 'delete'):
+            self.assertTrue(self.store.consume('asha@example.com', '123456'))
+            self.assertFalse(self.store.consume('asha@example.com', '123456'))
+
+
+class ModelOTPStoreTests(OTPStoreTests, TestCase):
+
+    def make_store(self):
+        return ModelOTPStore()
+
+
+@override_settings(JOB_QUEUE_EAGER=False)
+class OTPJobPayloadTests(TestCase):
+    """Delivery jobs carry the contact only; the OTP stays in the OTP store."""
+
+    def deliver_queued(self):
+        with mock.patch('alumni.utils.deliver_otp', return_value='sms') as deliver:
+            run_jobs(claim_due('test'))
+        return deliver
+
+    def test_sms_job_reads_live_otp(self):
+        otp = send_sms_otp('+919876543210')
+        job = Job.objects.get()
+        self.assertNotIn('otp', job.payload)
+        deliver = self.deliver_queued()
+        deliver.assert_called_once_with('sms', '919876543210', otp, fallback=None)
+        self.assertEqual(Job.objects.get().status, 'done')
+
+    def test_used_otp_is_not_sent(self):
+        otp = send_email_otp('asha@example.com')
+        self.assertTrue(verify_otp('asha@example.com', otp))
+        self.deliver_queued().assert_not_called()
+        self.assertEqual(Job.objects.get().status, 'done')
+
+    def test_batch_sends_only_live_otps(self):
+        send_email_otp('asha@example.com')
+        used = send_email_otp('ravi@example.com')
+        verify_otp('ravi@example.com', used)
+        with mock.patch('alumni.utils.get_provider') as get_provider:
+            get_provider.return_value.deliver_batch.return_value = [None]
+            self.assertEqual(run_jobs(claim_due('test')), 2)
+        (mails,), _ = get_provider.return_value.deliver_batch.call_args
+        self.assertEqual([to for to, _ in mails], ['asha@example.com'])
+
+    def test_legacy_payload_otp_is_scrubbed(self):
+        enqueue('sms_otp', {'contact': '+919876543210', 'otp': '123456'})
+        self.deliver_queued().assert_called_once_with('sms', '919876543210', '123456', fallback=None)
+        self.assertEqual(Job.objects.get().payload, {'contact': '+919876543210'})
+
+
+class AdminRoleTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='admin@example.com')
+
+    def fresh_user(self):
+        # A new request.user: nothing memoized
+        return User.objects.get(pk=self.user.pk)
+
+    def test_database_cache_is_bypassed(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(1):  # AdminUser only: no cache table read or write
+            self.assertEqual(admin_role(user), 'none')
+            self.assertEqual(admin_role(user), 'none')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_shared_cache_and_invalidation(self):
+        self.assertEqual(admin_role(self.fresh_user()), 'none')
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(admin_role(user), 'none')
+        AdminUser.objects.create(user=self.user, is_super_admin=True)
+        self.assertEqual(admin_role(self.fresh_user()), 'super_admin')
+        AdminUser.objects.filter(user=self.user).get().delete()
+        self.assertEqual(admin_role(self.fresh_user()), 'none')
+
+
+class NameIndexTests(TestCase):
+    """The in-memory fuzzy name index holds approved rows only."""
+
+    def setUp(self):
+        search._name_index = None
+        self.addCleanup(setattr, search, '_name_index', None)
+
+    def test_approved_rows_only(self):
+        approved = make_alumni(name='Ramesh Aggarwal', status='approved')
+        pending = make_alumni(name='Suresh Agrawal', email='b@example.com', contact_number='9876543211')
+        self.assertEqual(search.name_index().search('agarwal'), {approved.pk})
+
+        pending.status = 'approved'
+        pending.save()
+        self.assertEqual(search.name_index().search('agarwal'), {approved.pk, pending.pk})
+        approved.status = 'rejected'
+        approved.save(update_fields=['status'])
+        self.assertEqual(search.name_index().search('agarwal'), {pending.pk})
+
+    def test_stale_index_is_rebuilt_in_background(self):
+        old = search.name_index()
+        old.built_at -= 3600
+        with mock.patch('alumni.search.threading.Thread') as thread:
+            self.assertIs(search.name_index(), old)  # served while the rebuild runs
+        thread.assert_called_once_with(target=search._refresh_in_background, daemon=True)
+
+    def test_saves_during_rebuild_are_kept(self):
+        search.name_index()
+        build = search._build_name_index
+
+        def build_while_saving():
+            index = build()
+            make_alumni(name='Ravi Agarwal', status='approved')  # lands after the snapshot
+            return index
+
+        with mock.patch('alumni.search._build_name_index', build_while_saving):
+            self.assertTrue(search.refresh_name_index())
+        self.assertEqual(len(search.name_index().search('agarwal')), 1)
+
+
+class TokenBucketTests(TestCase):
+
+    def setUp(self):
+        self.limiter = TokenBucketLimiter({'contact': '3/1m', 'ip': '5/1m'})
+        self.now = 1_000_000.0
+
+    def hit(self, *buckets, after=0):
+        self.now += after
+        return self.limiter.hit(list(buckets), now=self.now)
+
+    def test_contact_runs_out_and_refills(self):
+        for _ in range(3):
+            self.assertEqual(self.hit(('contact', 'asha')), (True, 0))
+        self.assertEqual(self.hit(('contact', 'asha')), (False, 20))  # one token per 20 s
+        self.assertEqual(self.hit(('contact', 'ravi')), (True, 0))
+        self.assertEqual(self.hit(('contact', 'asha'), after=20), (True, 0))
+
+    def test_refused_hit_takes_no_tokens(self):
+        for _ in range(3):
+            self.hit(('contact', 'asha'), ('ip', '10.0.0.1'))
+        # The contact bucket refuses: the ip bucket must keep its 2 tokens
+        self.assertFalse(self.hit(('contact', 'asha'), ('ip', '10.0.0.1'))[0])
+        self.assertFalse(self.hit(('contact', 'asha'), ('ip', '10.0.0.1'))[0])
+        self.assertTrue(self.hit(('ip', '10.0.0.1'))[0])
+        self.assertTrue(self.hit(('ip', '10.0.0.1'))[0])
+        self.assertFalse(self.hit(('ip', '10.0.0.1'))[0])
+
+
+@override_settings(
+    JOB_QUEUE_EAGER=False,
+    OTP_RATE_LIMITS={'contact': '2/15m', 'ip': '100/15m', 'global': '1000/1m'},
+)
+class OTPRateLimitViewTests(TestCase):
+
+    def setUp(self):
+        ratelimit._limiter = None  # pick up the rates above
+        self.addCleanup(setattr, ratelimit, '_limiter', None)
+
+    def resend(self, contact):
+        return self.client.post(reverse('alumni:resend_otp'), {'contact': contact, 'type': 'phone'},
+                                content_type='application/json')
+
+    def test_formats_of_one_number_share_a_bucket(self):
+        self.assertEqual(self.resend('+91 98765 43210').status_code, 200)
+        self.assertEqual(self.resend('098765 43210').status_code, 200)
+        response = self.resend('9876543210')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(response.json()['retry_after']))
+        self.assertGreater(response.json()['retry_after'], 0)
+        self.assertEqual(self.resend('9123456780').status_code, 200)
+
+
+class TwoFactorClientTests(TestCase):
+    """TwoFactorClient against the local fake gateway."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = Fake2FactorServer().start_in_thread()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def setUp(self):
+        self.server.sent = self.server.fail_next = 0
+        self.client = TwoFactorClient('test-key', base_url=self.server.base_url, backoff=0)
+        self.addCleanup(self.client.close)
+
+    def test_success(self):
+        self.assertEqual(self.client.send_otp('919876543210', '123456')['Status'], 'Success')
+        self.assertEqual(self.server.sent, 1)
+
+    def test_503_is_retried(self):
+        self.server.fail_next = 1
+        self.assertEqual(self.client.send_otp('919876543210', '123456')['Status'], 'Success')
+        self.assertEqual((self.server.fail_next, self.server.sent), (0, 1))
+
+    def test_503_until_retries_run_out(self):
+        self.server.fail_next = 3  # first try + 2 retries
+        with self.assertRaisesMessage(SMSGatewayError, 'HTTP=503'):
+            self.client.send_otp('919876543210', '123456')
+        self.assertEqual(self.server.sent, 0)
+
+    def test_rejection_raises(self):
+        # Not a number: the gateway answers 404, which is not retried
+        with self.assertRaisesMessage(SMSGatewayError, 'HTTP=404'):
+            self.client.send_otp('not-a-number', '123456')
+        self.assertEqual(self.server.sent, 0)
+
+
+@override_settings(JOB_QUEUE_EAGER=False, JOB_RETRY_BASE_SECONDS=10, JOB_LOCK_TIMEOUT=60)
+@mock.patch.dict('alumni.jobs.JOB_HANDLERS', {
+    'fail': 'alumni.tests.failing_handler',
+    'ok': 'alumni.tests.succeeding_handler',
+})
+class JobQueueTests(TestCase):
+
+    def run_due(self):
+        return run_jobs(claim_due('test'))
+
+    def test_success(self):
+        job = enqueue('ok', {'to': 'asha'})
+        self.assertEqual(self.run_due(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('done', 1, 'test'))
+
+    def test_retry_with_backoff_then_fail(self):
+        job = enqueue('fail', max_attempts=2)
+        before = timezone.now()
+        with self.assertLogs('alumni.jobs', 'WARNING'):
+            self.assertEqual(self.run_due(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('queued', 1, ''))
+        self.assertIn('provider down', job.last_error)
+        # 10 s +/- 25% jitter
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=7.5))
+        self.assertLessEqual(job.run_after, timezone.now() + timedelta(seconds=12.5))
+        self.assertEqual(claim_due('test'), [])  # not due yet
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('alumni.jobs', 'ERROR'):
+            self.assertEqual(self.run_due(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(claim_due('test'), [])
+
+    def test_expired_job_is_not_run(self):
+        job = enqueue('ok', expires_at=timezone.now() - timedelta(seconds=1))
+        with mock.patch('alumni.tests.succeeding_handler') as handler:
+            self.assertEqual(self.run_due(), 0)
+        handler.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), ('failed', 'expired before delivery'))
+
+    def test_stale_job_is_requeued(self):
+        stale, fresh = enqueue('ok'), enqueue('ok')
+        self.assertTrue(claim(stale.pk, 'dead-worker'))
+        self.assertTrue(claim(fresh.pk, 'live-worker'))
+        Job.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(self.run_due(), 1)
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, 'done')
+        self.assertEqual(Job.objects.get(pk=fresh.pk).status, 'running')
+
+
+class AdminRemoveTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create(username='staff@example.com', is_staff=True))
+
+    def test_panel_posts_remove_with_csrf_token(self):
+        response = self.client.get(reverse('alumni:admin_panel'))
+        self.assertContains(response, 'onclick="confirmRemove(')
+        self.assertContains(response, '<form id="removeForm" method="post"')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_delete_action(self):
+        alumni = make_alumni(status='approved')
+        response = self.client.get(reverse('alumni:admin_action', args=[alumni.pk, 'delete']))
+        self.assertRedirects(response, reverse('alumni:admin_panel'), fetch_redirect_response=False)
+        self.assertTrue(Alumni.objects.filter(pk=alumni.pk).exists())  # GET never deletes
+
+        self.client.post(reverse('alumni:admin_action', args=[alumni.pk, 'delete']))
+        self.assertFalse(Alumni.objects.filter(pk=alumni.pk).exists())
+
+
+def jpeg_upload(name='asha.jpg'):
+    buf = io.BytesIO()
+    Image.new('RGB', (600, 400), 'teal').save(buf, 'JPEG')
+    return SimpleUploadedFile(name, buf.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(JOB_QUEUE_EAGER=False)
+class ThumbnailJobTests(TestCase):
+    """Uploads queue their thumbnails instead of rendering them in the request."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_upload_queues_job(self):
+        alumni = make_alumni(photo=jpeg_upload(), status='approved')
+        job = Job.objects.get(kind='thumbnails')
+        self.assertEqual(job.payload, {'alumni_id': alumni.pk, 'photo': alumni.photo.name})
+        self.assertFalse(Alumni.objects.get(pk=alumni.pk).thumbnails_available)
+
+        self.assertEqual(run_jobs(claim_due('test')), 1)
+        self.assertTrue(Alumni.objects.get(pk=alumni.pk).thumbnails_available)
+        self.assertTrue(default_storage.exists(thumbnail_name(alumni.photo.name, 'card')))
+
+    def test_replaced_photo_skips_stale_job(self):
+        alumni = make_alumni(photo=jpeg_upload())
+        first = alumni.photo.name
+        alumni.photo = jpeg_upload('asha-2.jpg')
+        alumni.save()
+        self.assertEqual(run_jobs(claim_due('test')), 2)
+        self.assertFalse(default_storage.exists(thumbnail_name(first, 'card')))
+        self.assertTrue(Alumni.objects.get(pk=alumni.pk).thumbnails_available)
+
+    def test_resave_queues_nothing(self):
+        alumni = make_alumni(photo=jpeg_upload())
+        alumni.city = 'Pune'
+        alumni.save()
+        self.assertEqual(Job.objects.filter(kind='thumbnails').count(), 1)
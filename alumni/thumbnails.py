@@ -0,0 +1,100 @@
+"""
+Fixed-size thumbnails for alumni photos.
+
+Each upload gets one square variant per THUMBNAIL_SIZES entry, stored next
+to the original as alumni_photos/thumbs/<stem>_<variant>.<ext>, so cards
+never download the full 4-8 MB phone photo. Uploads are processed by the
+job queue (kind 'thumbnails'); `manage.py generate_thumbnails` backfills.
+"""
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# variant -> square edge in px (about 2x the CSS size for HiDPI screens)
+THUMBNAIL_SIZES = {
+    'card': 160,
+    'admin': 120,
+    'detail': 480,
+}
+
+_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def thumbnail_format() -> str:
+    fmt = str(getattr(settings, "THUMBNAIL_FORMAT", "WEBP")).upper()
+    return fmt if fmt in _EXTENSIONS else 'WEBP'
+
+
+def thumbnail_name(photo_name: str, variant: str) -> str:
+    """Storage path of a variant, derived from the original's path (no DB lookup)."""
+    directory, filename = posixpath.split(photo_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'thumbs', f"{stem}_{variant}.{_EXTENSIONS[thumbnail_format()]}")
+
+
+def _render(image, size, fmt):
+    thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    buf = io.BytesIO()
+    if fmt == 'JPEG':
+        thumb.save(buf, 'JPEG', quality=82, optimize=True, progressive=True)
+    else:
+        thumb.save(buf, 'WEBP', quality=80, method=4)
+    return buf.getvalue()
+
+
+def generate_thumbnails(photo_name: str) -> bool:
+    """
+    Write every variant for ``photo_name``; existing variants are replaced.
+    Returns False (and logs) if the original can't be read or decoded.
+    """
+    fmt = thumbnail_format()
+    largest = max(THUMBNAIL_SIZES.values())
+    try:
+        with default_storage.open(photo_name, 'rb') as fh:
+            image = Image.open(fh)
+            # JPEG can decode straight to a reduced scale: much cheaper for big photos
+            image.draft('RGB', (largest * 2, largest * 2))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGB')
+    except Exception:
+        logger.exception("[thumbnails] could not read %s", photo_name)
+        return False
+
+    for variant, size in THUMBNAIL_SIZES.items():
+        name = thumbnail_name(photo_name, variant)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(_render(image, size, fmt)))
+    return True
+
+
+def make_alumni_thumbnails(alumni_id, photo):
+    """
+    Job handler (kind 'thumbnails', queued by Alumni.save on upload): write
+    the variants of ``photo`` and set thumbnails_available. Skipped if the
+    record has a different photo by now; that upload queued its own job.
+    """
+    from .models import Alumni
+
+    current = Alumni.objects.filter(pk=alumni_id, photo=photo)
+    if not current.exists():
+        return
+    ok = generate_thumbnails(photo)
+    current.update(thumbnails_available=ok)
+
+
+def delete_thumbnails(photo_name: str):
+    for variant in THUMBNAIL_SIZES:
+        name = thumbnail_name(photo_name, variant)
+        try:
+            if default_storage.exists(name):
+                default_storage.delete(name)
+        except Exception:
+            logger.exception("[thumbnails] could not delete %s", name)
@@ -38,4 +38,7 @@ urlpatterns = [
     path('admin-logout/', views.admin_logout_view, name='admin_logout'),
     path('admin-edit/<int:alumni_id>/', views.admin_edit_alumni_view, name='admin_edit_alumni'),
     path('admin-search/', views.admin_search_view, name='admin_search'),
+    path('admin-panel/otp-health/', views.admin_otp_health_view, name='admin_otp_health'),
+    path('admin-panel/stats/', views.admin_stats_view, name='admin_stats'),
+    path('admin-panel/stats/data/', views.admin_stats_json_view, name='admin_stats_json'),
 ]
@@ -1,39 +1,17 @@
 import random
 import string
-import pandas as pd
 from datetime import timedelta
 from django.utils import timezone
-from django.db import models
 from django.conf import settings
-from .models import OTPVerification
+from .otp_store import get_otp_store
+from .jobs import enqueue
+from .otp_backends import deliver_otp, get_provider
+from .contacts import contact_q, normalize_phone
 import os
-import requests
-import mailtrap as mt
 import re
+import logging
 
-# -------------------------------
-# NORMALIZERS (added)
-# -------------------------------
-def normalize_academic_association(raw: str) -> str:
-    """
-    Map verbose survey text to your allowed choices:
-    'UG', 'PG', 'UG_PG' (fits max_length=10).
-    """
-    s = (raw or "").strip().upper().replace("&", "AND")
-    if "BOTH" in s or "UG AND PG" in s:
-        return "UG_PG"
-    if "UG" in s and "PG" not in s:
-        return "UG"
-    if "PG" in s and "UG" not in s:
-        return "PG"
-    return "UG"  # safe default
-
-
-def _truncate(s, n):
-    """Trim strings to column max_length to avoid DB DataError."""
-    s = (s or "").strip()
-    return s if len(s) <= n else s[:n]
-
+logger = logging.getLogger(__name__)
 
 # -------------------------------
 # OTP GENERATION
@@ -48,206 +26,133 @@ def generate_otp():
 # -------------------------------
 def _normalize_msisdn(contact: str) -> str:
     """
-    Normalize to Indian MSISDN for 2Factor: digits only.
-    Returns 91XXXXXXXXXX (12 digits) when possible.
+    MSISDN for 2Factor: the E.164 number without '+', e.g. 91XXXXXXXXXX.
+    Falls back to the bare digits (provider may reject; we still log/send).
     """
-    digits = re.sub(r"\D", "", str(contact or ""))
-    if len(digits) == 10:
-        return "91" + digits
-    if digits.startswith("91") and len(digits) == 12:
-        return digits
-    # Fall back to digits as-is (provider may reject; we still log/send)
-    return digits
+    return normalize_phone(contact).lstrip("+") or re.sub(r"\D", "", str(contact or ""))
 
 
 # -------------------------------
-# SEND SMS OTP  (UPDATED)
+# ISSUE OTP (saved now, delivered by the job queue)
 # -------------------------------
-def send_sms_otp(contact):
-    """Send OTP via SMS and save it in DB."""
-    print(f"Attempting to send OTP to: {contact}")
+def issue_otp(contact):
+    """Create the single live OTP for ``contact`` in the OTP store; returns (otp, expires_at)."""
     otp = generate_otp()
     expires_at = timezone.now() + timedelta(minutes=getattr(settings, "OTP_EXPIRY_MINUTES", 5))
+    get_otp_store().issue(contact, otp, expires_at)
+    return otp, expires_at
 
-    # Keep only one live OTP per contact
-    OTPVerification.objects.filter(contact=contact).delete()
-
-    OTPVerification.objects.create(
-        contact=contact,
-        otp=otp,
-        expires_at=expires_at,
-        is_verified=False
-    )
 
-    print(f"Generated OTP: {otp}, Expiry Time: {expires_at}")
+# -------------------------------
+# SEND SMS OTP  (UPDATED)
+# -------------------------------
+def send_sms_otp(contact, fallback_email=None):
+    """
+    Save a new OTP and queue its SMS delivery (see alumni/jobs.py). The job
+    holds only the contact; the handler reads the OTP from the OTP store.
+    ``fallback_email`` receives the same OTP if the SMS provider is down.
+    """
+    otp, expires_at = issue_otp(contact)
+    logger.debug("[otp] SMS OTP for %s issued, expires %s", contact, expires_at)
 
-    # --- FIX: ensure digits-only MSISDN for 2Factor (no '+') ---
-    phone = _normalize_msisdn(contact)
-    print(f"Sending OTP to phone number (normalized): {phone}")
+    payload = {'contact': contact}
+    if fallback_email:
+        payload['fallback_email'] = fallback_email
+    enqueue('sms_otp', payload, expires_at=expires_at)
+    return otp
 
-    api_key = settings.TWO_FACTOR_API_KEY
 
-    # Optional: support DLT template if provided via settings.TWO_FACTOR_TEMPLATE
-    template = getattr(settings, "TWO_FACTOR_TEMPLATE", "").strip()
-    if template:
-        url = f"https://2factor.in/API/V1/{api_key}/SMS/{phone}/{otp}/{template}"
-    else:
-        url = f"https://2factor.in/API/V1/{api_key}/SMS/{phone}/{otp}"
+def _live_otp(contact):
+    """The OTP a delivery job should send; None once it was used, replaced or expired."""
+    otp = get_otp_store().live_otp(contact)
+    if otp is None:
+        logger.info("[otp] nothing to deliver to %s (OTP used, replaced or expired)", contact)
+    return otp
 
-    try:
-        res = requests.get(url, timeout=8)
-        try:
-            payload = res.json()
-        except Exception:
-            payload = {"raw": res.text}
-
-        print("SMS OTP Response:", payload)
-
-        # 2Factor typically returns {"Status": "Success", "Details": "..."}
-        status_val = str(payload.get("Status") or payload.get("status") or "").lower()
-        if res.status_code == 200 and status_val == "success":
-            print(f"OTP sent successfully to {phone}")
-        else:
-            # Keep the OTP in DB (user can try email or resend); surface clear logs
-            print(f"Failed to send OTP to {phone}, HTTP={res.status_code}, Status={status_val}, Payload={payload}")
-    except Exception as e:
-        print("SMS OTP Error:", e)
 
-    return otp
+def deliver_sms_otp(contact, fallback_email=None, otp=None):
+    """
+    Job handler: send the live OTP of ``contact`` via the 'sms' OTP backend.
+    Raises so the queue retries. (``otp`` is only set by jobs queued before
+    payloads stopped carrying it.)
+    """
+    otp = _live_otp(contact) if otp is None else otp
+    if otp is None:
+        return
+    # --- FIX: ensure digits-only MSISDN for 2Factor (no '+') ---
+    phone = _normalize_msisdn(contact)
+    channel = deliver_otp('sms', phone, otp, fallback=fallback_email)
+    logger.info("[otp] SMS OTP sent to %s via %s", phone if channel == 'sms' else fallback_email, channel)
 
 
 # -------------------------------
 # SEND EMAIL OTP  (MINOR SAFE GUARD)
 # -------------------------------
-def send_email_otp(email):
-    """Send OTP via email using Mailtrap and save it in DB."""
-    otp = generate_otp()
-    expires_at = timezone.now() + timedelta(minutes=getattr(settings, "OTP_EXPIRY_MINUTES", 5))
-
-    # Remove old OTPs for this email
-    OTPVerification.objects.filter(contact=email).delete()
-
-    # Save OTP in DB
-    OTPVerification.objects.create(
-        contact=email,
-        otp=otp,
-        expires_at=expires_at,
-        is_verified=False
-    )
-
-    # Log OTP being generated and saved
-    print(f"Generated OTP for {email}: {otp}")
-
-    # HTML email content
-    otp_html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-      <style>
-        body {{
-          font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-          background-color: #f4f4f4;
-          margin: 0;
-          padding: 0;
-        }}
-        .container {{
-          background-color: #ffffff;
-          max-width: 480px;
-          margin: 30px auto;
-          padding: 30px;
-          border-radius: 10px;
-          box-shadow: 0 4px 8px rgba(0, 0, 0, 0.05);
-        }}
-        .title {{
-          font-size: 20px;
-          font-weight: 600;
-          color: #2c3e50;
-          text-align: center;
-        }}
-        .otp-code {{
-          font-size: 32px;
-          font-weight: bold;
-          color: #e74c3c;
-          text-align: center;
-          margin: 20px 0;
-        }}
-        .note {{
-          font-size: 14px;
-          color: #7f8c8d;
-          text-align: center;
-        }}
-      </style>
-    </head>
-    <body>
-      <div class="container">
-        <div class="title">UCMS Alumni Portal OTP Verification</div>
-        <p class="otp-code">{otp}</p>
-        <p class="note">This OTP is valid for 5 minutes. Please do not share it with anyone.</p>
-      </div>
-    </body>
-    </html>
+def send_email_otp(email, fallback_phone=None):
+    """
+    Save a new OTP and queue its e-mail delivery (see alumni/jobs.py). The
+    job holds only the address; the handler reads the OTP from the OTP store.
+    ``fallback_phone`` receives the same OTP if the e-mail provider is down.
     """
+    otp, expires_at = issue_otp(email)
+    logger.debug("[otp] e-mail OTP for %s issued, expires %s", email, expires_at)
+
+    payload = {'email': email}
+    if fallback_phone:
+        payload['fallback_phone'] = fallback_phone
+    enqueue('email_otp', payload, expires_at=expires_at)
+    return otp
 
-    # Prepare Mailtrap client and email
-    client = mt.MailtrapClient(token=settings.MAILTRAP_API_KEY)
-
-    sender_email = getattr(settings, "DEFAULT_FROM_EMAIL", "hello@demomailtrap.co")
-    if sender_email.endswith("demomailtrap.co"):
-        # Helpful warning so you know if you’re on Sandbox (captured, not delivered)
-        print("⚠️  Mailtrap warning: DEFAULT_FROM_EMAIL looks like a sandbox sender "
-              "(demomailtrap.co). Emails may be captured and not delivered in production.")
-
-    mail = mt.Mail(
-        sender=mt.Address(
-            email=sender_email,
-            name="UCMS Alumni Portal"
-        ),
-        to=[mt.Address(email=email)],
-        subject="Your OTP - UCMS Alumni Portal",
-        text=f"Your OTP for UCMS Alumni Portal is {otp}. It is valid for 5 minutes.",
-        html=otp_html,
-        category="OTP Verification"
-    )
 
+def deliver_email_otp(email, fallback_phone=None, otp=None):
+    """Job handler: send the live OTP of ``email`` via the 'email' OTP backend. Raises so the queue retries."""
+    otp = _live_otp(email) if otp is None else otp
+    if otp is None:
+        return
+    fallback = _normalize_msisdn(fallback_phone) if fallback_phone else None
+    channel = deliver_otp('email', email, otp, fallback=fallback)
+    logger.info("[otp] e-mail OTP sent to %s via %s", email if channel == 'email' else fallback, channel)
+
+
+def deliver_email_otp_batch(payloads):
+    """Batch job handler: one provider call for many OTP mails; one error (or None) per payload."""
+    otps = [p.get('otp') or _live_otp(p['email']) for p in payloads]
+    # Payloads whose OTP is gone have nothing to send and count as done
+    pending = [(i, p) for i, (p, otp) in enumerate(zip(payloads, otps)) if otp is not None]
+    errors = [None] * len(payloads)
+    if not pending:
+        return errors
     try:
-        response = client.send(mail)
-        print("✅ Email OTP sent (Mailtrap API call executed):", response)
-        try:
-            print(f"Message ID(s): {response.get('message_ids')}")
-        except Exception:
-            pass
+        batch_errors = get_provider('email').deliver_batch([(p['email'], otps[i]) for i, p in pending])
     except Exception as e:
-        print("❌ Error sending Email OTP:", e)
-        print(f"Error details: {e}")
-
-    return otp
+        # Whole batch refused (e.g. circuit open): try each mail's fallback route
+        batch_errors = []
+        for i, p in pending:
+            try:
+                if not p.get('fallback_phone'):
+                    raise e
+                deliver_otp('sms', _normalize_msisdn(p['fallback_phone']), otps[i])
+                batch_errors.append(None)
+            except Exception as fallback_error:
+                batch_errors.append(fallback_error)
+    for (i, _), error in zip(pending, batch_errors):
+        errors[i] = error
+    accepted = batch_errors.count(None)
+    log = logger.info if accepted == len(batch_errors) else logger.warning
+    log("[otp] e-mail OTP batch: %s/%s accepted", accepted, len(batch_errors))
+    return errors
 
 
 # -------------------------------
-# VERIFY OTP (LOCAL DB)
+# VERIFY OTP
 # -------------------------------
 def verify_otp(contact, otp):
-    """Verify OTP from local database."""
-    try:
-        otp_record = OTPVerification.objects.get(
-            contact=contact,
-            otp=otp,
-            is_verified=False
-        )
-
-        # Check if OTP is still valid
-        if otp_record.expires_at > timezone.now():
-            otp_record.is_verified = True
-            otp_record.save()
-            print(f"OTP verified for {contact}")
-            return True
-        else:
-            print(f"OTP expired for {contact}")
-            return False
-
-    except OTPVerification.DoesNotExist:
-        print(f"No valid OTP found for {contact}")
-        return False
+    """Verify (and use up) an OTP from the OTP store."""
+    if get_otp_store().consume(contact, otp):
+        logger.info("[otp] OTP verified for %s", contact)
+        return True
+    logger.info("[otp] no valid OTP for %s (wrong, used or expired)", contact)
+    return False
 
 
 # -------------------------------
@@ -257,127 +162,34 @@ def check_existing_alumni(contact):
     """Check if alumni exists in database."""
     from .models import Alumni
 
-    return Alumni.objects.filter(
-        models.Q(email=contact) | models.Q(contact_number=contact),
-        status='approved'
-    ).first()
+    return Alumni.objects.filter(contact_q(contact), status='approved').first()
 
 
 # -------------------------------
 # IMPORT ALUMNI FROM EXCEL
 # -------------------------------
-def import_alumni_from_excel():
-    """Import alumni data from Excel file."""
-    try:
-        excel_path = os.path.join(settings.BASE_DIR, 'attached_assets', 'alumni_list_1754148285179.xlsx')
-        if not os.path.exists(excel_path):
-            print(f"Excel file not found at {excel_path}")
-            return 0
-
-        df = pd.read_excel(excel_path)
-        from .models import Alumni
-        imported_count = 0
+def import_alumni_from_excel(excel_path=None, batch_size=500, dry_run=False, chunk_size=5000, adopt=False):
+    """
+    Import alumni data from the survey Excel export (streamed in chunks).
+    Rows already imported are upserted: only changed ones are rewritten.
+    Returns an ImportSummary (inserted/updated/adopted/unchanged/skipped/failed + rejects).
+    """
+    from .importer import ImportSummary, import_alumni_file
 
-        for index, row in df.iterrows():
-            try:
-                name = str(row.get('Your Name ', '')).strip()
-                email = str(row.get('Email Address', '')).strip()
-                contact_number = str(row.get('Your Contact Number (WhatsApp)', '')).strip()
-                alternate_contact = str(row.get('Your Contact Number (Alternate)', '')).strip()
-
-                if not name or (not email and not contact_number):
-                    continue
-
-                if email.lower() in ['nan', '']:
-                    email = ''
-                if contact_number.lower() in ['nan', '']:
-                    contact_number = ''
-
-                if not email and not contact_number:
-                    continue
-
-                # --- improved duplicate check: ignore blanks ---
-                dup_q = models.Q()
-                if email:
-                    dup_q |= models.Q(email__iexact=email)
-                if contact_number:
-                    dup_q |= models.Q(contact_number=contact_number)
-                if dup_q and Alumni.objects.filter(dup_q).exists():
-                    continue
-
-                # Build dict
-                alumni_data = {
-                    'name': name,
-                    'email': email,
-                    'contact_number': contact_number,
-                    'alternate_contact': '' if alternate_contact.lower() == 'nan' else alternate_contact,
-                    'academic_association': str(row.get('Please Specify Your Academic Association With UCMS ', '')).strip(),
-                    'joining_year_ug': 2000,
-                    'joining_year_pg': None,
-                    'specialty': str(row.get('Specialty', '')).strip(),
-                    'country': str(row.get('Which Country Are You Currently Working In? ', '')).strip(),
-                    'state': str(row.get('Which State/UT Are You Currently Working In (If in India)? \n(Select N/A if Outside India)', '')).strip(),
-                    'city': str(row.get('Which City Are You Currently Working In? \n(If in India)', '')).strip(),
-                    'current_designation': str(row.get('What is Your Current Designation?', '')).strip(),
-                    'current_work_association': str(row.get('Please Specify Your Current Work Association', '')).strip(),
-                    'associated_hospital': str(row.get('Name of the Associated Hospital/College/Institute\n(Please Mention Full Name)', '')).strip(),
-                    'status': 'approved',
-                    'is_verified': True
-                }
-
-                # --- normalize + trim to model limits BEFORE save (added) ---
-                alumni_data['academic_association'] = normalize_academic_association(
-                    alumni_data.get('academic_association', '')
-                )
-                alumni_data['specialty'] = _truncate(alumni_data.get('specialty'), 200)
-                alumni_data['country'] = _truncate(alumni_data.get('country'), 100)
-                alumni_data['state'] = _truncate(alumni_data.get('state'), 100)
-                alumni_data['city'] = _truncate(alumni_data.get('city'), 100)
-                alumni_data['current_designation'] = _truncate(alumni_data.get('current_designation'), 200)
-                alumni_data['current_work_association'] = _truncate(alumni_data.get('current_work_association'), 200)
-                alumni_data['associated_hospital'] = _truncate(alumni_data.get('associated_hospital'), 200)
-
-                try:
-                    jy_ug = str(row.get('Joining Year (UG) ', '')).strip()
-                    jy_pg = str(row.get('Joining Year (PG) (Select N/A if Not Applicable)', '')).strip()
-
-                    alumni_data['joining_year_ug'] = int(jy_ug) if jy_ug.isdigit() else 2000
-                    alumni_data['joining_year_pg'] = int(jy_pg) if jy_pg.isdigit() else None
-                except:
-                    pass
-
-                # --- create with a defensive retry (added) ---
-                try:
-                    Alumni.objects.create(**alumni_data)
-                    imported_count += 1
-                except Exception as e:
-                    # retry: lower-case email and re-apply trims (paranoid)
-                    alumni_data['email'] = alumni_data.get('email', '').lower()
-                    alumni_data['specialty'] = _truncate(alumni_data.get('specialty'), 200)
-                    alumni_data['country'] = _truncate(alumni_data.get('country'), 100)
-                    alumni_data['state'] = _truncate(alumni_data.get('state'), 100)
-                    alumni_data['city'] = _truncate(alumni_data.get('city'), 100)
-                    alumni_data['current_designation'] = _truncate(alumni_data.get('current_designation'), 200)
-                    alumni_data['current_work_association'] = _truncate(alumni_data.get('current_work_association'), 200)
-                    alumni_data['associated_hospital'] = _truncate(alumni_data.get('associated_hospital'), 200)
-
-                    try:
-                        Alumni.objects.create(**alumni_data)
-                        imported_count += 1
-                    except Exception as e2:
-                        print(f"Row {index} failed: {e2}")
-                        continue
-
-            except Exception as e:
-                print(f"Error importing row {index}: {e}")
-                continue
-
-        print(f"Successfully imported {imported_count} alumni from Excel")
-        return imported_count
+    excel_path = excel_path or os.path.join(settings.BASE_DIR, 'attached_assets', 'alumni_list_1754148285179.xlsx')
+    if not os.path.exists(excel_path):
+        summary = ImportSummary()
+        summary.reject(None, f"Excel file not found at {excel_path}")
+        return summary
 
+    try:
+        return import_alumni_file(
+            excel_path, 'xlsx', chunk_size=chunk_size, batch_size=batch_size, dry_run=dry_run, adopt=adopt,
+        )
     except Exception as e:
-        print(f"Error reading Excel file: {e}")
-        return 0
+        summary = ImportSummary()
+        summary.reject(None, f"Error reading Excel file: {e}")
+        return summary
 
 
 # -------------------------------
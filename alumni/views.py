@@ -1,21 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
 from django.contrib import messages
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Q
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 from django.conf import settings
 from django.db import IntegrityError
 
 import json
-from .models import Alumni, AdminUser, OTPVerification
+from .models import Alumni
 from .forms import (
     AlumniLoginForm, OTPVerificationForm, AlumniRegistrationForm,
     AdminLoginForm, AlumniFilterForm
 )
 from .utils import send_sms_otp, send_email_otp, verify_otp, check_existing_alumni
+from .search import apply_text_search
+from .pagination import keyset_page, page_size_from
+from .otp_backends import provider_health
+from .otp_store import get_otp_store
+from .ratelimit import check_otp_rate
+from .accounts import resolve_login
+from .contacts import contact_q, contacts_q
+from .facets import apply_facets, facet_counts, facet_panels, selected_facets
+from .roles import admin_required, is_admin, is_super_admin  # noqa: F401
+from .stats import stats_summary
 from django.utils import timezone
 import logging
 
@@ -23,24 +34,36 @@ from django.urls import reverse
 
 logger = logging.getLogger(__name__)
 
-# keep these helpers at top of alumni/views.py
-def is_admin(user):
-    return user.is_superuser or user.is_staff or AdminUser.objects.filter(user=user).exists()
+# Keyset orderings (last key must be unique)
+DIRECTORY_ORDERING = ('name', 'id')
+ADMIN_SEARCH_ORDERING = ('-created_at', '-id')
+RANKED_ORDERING = ('-search_rank', 'id')
+
+def _rate_limited(retry_after, message='Too many OTP requests. Please try again later.'):
+    """429 JSON response for the OTP endpoints."""
+    response = JsonResponse({'success': False, 'message': message, 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
 
-def is_super_admin(user):
-    return user.is_superuser or AdminUser.objects.filter(user=user, is_super_admin=True).exists()
 
 def login_view(request):
     if request.method == 'POST':
         form = AlumniLoginForm(request.POST)
         if form.is_valid():
             contact = form.cleaned_data['contact']
+            allowed, retry_after = check_otp_rate(request, contact)
+            if not allowed:
+                messages.error(request, f'Too many OTP requests. Please try again in {retry_after} seconds.')
+                response = render(request, 'alumni/login.html', {'form': form}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
             existing_alumni = check_existing_alumni(contact)
             if existing_alumni:
+                # The other channel on file is the fallback if this provider is down
                 if '@' in contact:
-                    send_email_otp(contact)
+                    send_email_otp(contact, fallback_phone=existing_alumni.contact_number)
                 else:
-                    send_sms_otp(contact)
+                    send_sms_otp(contact, fallback_email=existing_alumni.email)
                 request.session['login_contact'] = contact
                 request.session['alumni_id'] = existing_alumni.id
                 return redirect('alumni:verify_otp')
@@ -54,7 +77,7 @@ def login_view(request):
 def verify_otp_view(request):
     """
     Login OTP verification (separate from registration).
-    Avoids OneToOne clashes by not re-linking a User already owned by another Alumni.
+    User lookup/creation and linking happen in accounts.resolve_login().
     Always passes an auth backend to login() so the session persists.
     """
     contact = request.session.get('login_contact')
@@ -76,83 +99,20 @@ def verify_otp_view(request):
                 messages.error(request, 'Invalid or expired OTP. Please try again.')
                 return render(request, 'alumni/verify_otp.html', {'form': form, 'contact': contact})
 
-            # 2) Resolve the Alumni row
-            alumni = None
-            alumni_id = request.session.get('alumni_id')
-            if alumni_id:
-                alumni = Alumni.objects.filter(id=alumni_id).first()
-
-            if alumni is None:
-                qs = Alumni.objects.filter(Q(email__iexact=contact) | Q(contact_number=contact))
-                # Prefer a row already linked to a user (avoids re-link attempts)
-                alumni = qs.filter(user__isnull=False).order_by('-created_at').first() or qs.order_by('-created_at').first()
-
-            if alumni is None:
+            # 2) Resolve (or create) the User and link it to the Alumni row
+            alumni_id, user = resolve_login(contact, request.session.get('alumni_id'))
+            if user is None:
                 messages.error(request, 'We could not find your profile. Please register first.')
                 return redirect('alumni:register')
 
-            # 3) Pick or create the User
-            user = alumni.user
-            if not user:
-                # If another alumni with same contact is already linked, reuse that user
-                conflict_alumni = Alumni.objects.filter(
-                    user__isnull=False
-                ).filter(
-                    Q(email__iexact=contact) | Q(contact_number=contact)
-                ).exclude(pk=alumni.pk).first()
-                if conflict_alumni:
-                    user = conflict_alumni.user
-
-            if not user:
-                # Try by likely usernames
-                user = User.objects.filter(username=contact).first()
-                if not user and alumni.email:
-                    user = User.objects.filter(username=alumni.email).first()
-                if not user and alumni.contact_number:
-                    user = User.objects.filter(username=alumni.contact_number).first()
-
-            if not user:
-                # Create new user
-                base_username = contact or alumni.email or alumni.contact_number or (alumni.name or "user").replace(" ", "").lower()
-                username = base_username
-                i = 1
-                while User.objects.filter(username=username).exists():
-                    username = f"{base_username}_{i}"
-                    i += 1
-
-                user = User(
-                    username=username,
-                    email=(contact if "@" in contact else (alumni.email or "")),
-                    first_name=(alumni.name.split()[0] if alumni.name else "")
-                )
-                user.set_unusable_password()
-                user.save()
-
-            # 4) Link Alumni → User only if no other Alumni owns this user
-            try:
-                if alumni.user_id != user.id:
-                    if Alumni.objects.filter(user=user).exclude(pk=alumni.pk).exists():
-                        # Someone else already owns this user; don't relink.
-                        logger.warning("User %s already linked to another Alumni. Skipping relink.", user.id)
-                    else:
-                        alumni.user = user
-                        alumni.save(update_fields=['user'])
-            except IntegrityError:
-                # Safety: if the race condition still happens, skip relink and continue.
-                logger.warning("IntegrityError linking user %s to alumni %s; proceeding with login.", user.id, alumni.id)
-
-            # 5) Login with explicit backend so the session sticks
+            # 3) Login with explicit backend so the session sticks
             backend = settings.AUTHENTICATION_BACKENDS[0]  # e.g. 'django.contrib.auth.backends.ModelBackend'
             login(request, user, backend=backend)
+            request.session['alumni_id'] = alumni_id
 
-            # Optional: align session alumni_id with the actually-linked row
-            linked_row = Alumni.objects.filter(user=user).first()
-            if linked_row:
-                request.session['alumni_id'] = linked_row.id
-
-            # 6) Clean session + redirect
+            # 4) Clean session + redirect
             request.session.pop('login_contact', None)
-            logger.info("OTP login OK for alumni_id=%s user_id=%s", (linked_row or alumni).id, user.id)
+            logger.info("OTP login OK for alumni_id=%s user_id=%s", alumni_id, user.id)
             return redirect('alumni:directory')
 
         except Exception:
@@ -172,45 +132,64 @@ def verify_otp_view(request):
 
 @login_required
 def directory_view(request):
-    """Alumni directory with filters - only shows results when searched"""
+    """
+    Alumni directory with filters - only shows results when searched.
+    Results are keyset-paginated; ?cursor=...&format=json returns the next
+    page as rendered cards for the infinite scroll.
+    """
     form = AlumniFilterForm(request.GET)
     alumni_list = Alumni.objects.none()
-    has_search_params = any(request.GET.get(field) for field in [
+    ordering = DIRECTORY_ORDERING
+    facets = selected_facets(request.GET)
+    has_search_params = bool(facets) or any(request.GET.get(field) for field in [
         'name', 'joining_year', 'work_association', 'specialization', 'location', 'designation'
     ])
 
-    if has_search_params and form.is_valid():
-        alumni_list = Alumni.objects.filter(status='approved')
-        
-        if form.cleaned_data['name']:
-            alumni_list = alumni_list.filter(name__icontains=form.cleaned_data['name'])
+    form_valid = form.is_valid()
+    if has_search_params and form_valid:
+        alumni_list = apply_facets(Alumni.objects.filter(status='approved'), facets)
+
         if form.cleaned_data['joining_year']:
             alumni_list = alumni_list.filter(joining_year_ug=form.cleaned_data['joining_year'])
-        if form.cleaned_data['work_association']:
-            alumni_list = alumni_list.filter(current_work_association__icontains=form.cleaned_data['work_association'])
-        if form.cleaned_data['specialization']:
-            alumni_list = alumni_list.filter(specialty__icontains=form.cleaned_data['specialization'])
-        if form.cleaned_data['location']:
-            alumni_list = alumni_list.filter(
-                Q(city__icontains=form.cleaned_data['location']) |
-                Q(state__icontains=form.cleaned_data['location']) |
-                Q(country__icontains=form.cleaned_data['location'])
-            )
-        if form.cleaned_data['designation']:
-            alumni_list = alumni_list.filter(current_designation__icontains=form.cleaned_data['designation'])
+
+        # Free-text fields go through the full-text index (ranked)
+        alumni_list, ranked = apply_text_search(alumni_list, form.cleaned_data)
+        if ranked:
+            ordering = RANKED_ORDERING
+
+    cursor = request.GET.get('cursor')
+    page, next_cursor = keyset_page(alumni_list, ordering, cursor, page_size_from(request))
 
     alumni_list_with_delay = []
-    for idx, alumni in enumerate(alumni_list):
+    for idx, alumni in enumerate(page):
         alumni_list_with_delay.append({
             "alumni": alumni,
             "delay": (idx + 1) * 50
         })
 
-    return render(request, 'alumni/directory.html', {
+    context = {
         'alumni_list': alumni_list_with_delay,
         'filter_form': form,
-        'has_search_params': has_search_params
-    })
+        'has_search_params': has_search_params,
+        'next_cursor': next_cursor,
+    }
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'grid_html': render_to_string('alumni/_directory_grid_items.html', context, request=request),
+            'list_html': render_to_string('alumni/_directory_list_items.html', context, request=request),
+            'next_cursor': next_cursor,
+        })
+
+    # Total only on the first page; scrolling pages don't need it
+    context['total_count'] = alumni_list.count() if next_cursor else len(page)
+
+    # Facets describe the results, or every approved alumnus before a search
+    if form_valid:
+        facet_source = alumni_list if has_search_params else Alumni.objects.filter(status='approved')
+        counts = facet_counts(facet_source, {**form.cleaned_data, **facets})
+        context['facet_panels'] = facet_panels(counts, request.GET, facets)
+    return render(request, 'alumni/directory.html', context)
 
     
 # (Other views such as profile_view, admin panel views, etc. remain unchanged)
@@ -236,11 +215,15 @@ def register_view(request):
         email = (request.POST.get('email') or '').strip()
         phone = (request.POST.get('contact_number') or '').strip()
 
+        allowed, retry_after = check_otp_rate(request, email, phone)
+        if not allowed:
+            return _rate_limited(retry_after)
+
         existing = None
         if email or phone:
             existing = (
                 Alumni.objects
-                .filter(Q(email__iexact=email) | Q(contact_number=phone))
+                .filter(contacts_q(email, phone))
                 .order_by('-created_at')
                 .first()
             )
@@ -364,12 +347,16 @@ def resend_otp_view(request):
     if not contact or otp_type not in {'phone', 'email'}:
         return JsonResponse({'success': False, 'message': 'Invalid request data.'}, status=400)
 
+    allowed, retry_after = check_otp_rate(request, contact)
+    if not allowed:
+        return _rate_limited(retry_after)
+
     try:
         if otp_type == 'phone':
-            print(f"resend_otp_view: resending SMS OTP to {contact}")
+            logger.debug("[resend_otp_view] resending SMS OTP to %s", contact)
             send_sms_otp(contact)
         else:
-            print(f"resend_otp_view: resending Email OTP to {contact}")
+            logger.debug("[resend_otp_view] resending e-mail OTP to %s", contact)
             send_email_otp(contact)
     except Exception as e:
         return JsonResponse({'success': False, 'message': f'Error resending OTP: {e}'}, status=500)
@@ -408,41 +395,18 @@ def verify_registration_otp_view(request):
     phone_valid = not require_phone
     email_valid = not require_email
 
-    from django.utils import timezone
+    store = get_otp_store()
     if require_phone:
-        try:
-            OTPVerification.objects.get(
-                contact=alumni.contact_number,
-                otp=phone_otp,
-                expires_at__gt=timezone.now(),
-                is_verified=False,
-            )
-            phone_valid = True
-        except OTPVerification.DoesNotExist:
-            phone_valid = False
-
+        phone_valid = store.check(alumni.contact_number, phone_otp)
     if require_email:
-        try:
-            OTPVerification.objects.get(
-                contact=alumni.email,
-                otp=email_otp,
-                expires_at__gt=timezone.now(),
-                is_verified=False,
-            )
-            email_valid = True
-        except OTPVerification.DoesNotExist:
-            email_valid = False
+        email_valid = store.check(alumni.email, email_otp)
 
     if phone_valid and email_valid:
         # Mark OTPs as used
-        if require_phone and phone_otp:
-            OTPVerification.objects.filter(
-                contact=alumni.contact_number, otp=phone_otp
-            ).update(is_verified=True)
-        if require_email and email_otp:
-            OTPVerification.objects.filter(
-                contact=alumni.email, otp=email_otp
-            ).update(is_verified=True)
+        if require_phone:
+            store.consume(alumni.contact_number, phone_otp)
+        if require_email:
+            store.consume(alumni.email, email_otp)
 
         alumni.is_verified = True
         alumni.save(update_fields=['is_verified'])
@@ -483,9 +447,7 @@ def profile_view(request):
     except Alumni.DoesNotExist:
         # Try to find & (safely) link a matching alumni record
         guesses = Alumni.objects.filter(
-            Q(email__iexact=request.user.email) |
-            Q(email__iexact=request.user.username) |
-            Q(contact_number=request.user.username)
+            contact_q(request.user.email) | contact_q(request.user.username)
         ).order_by('-created_at')
 
         match = guesses.first()
@@ -556,59 +518,63 @@ def admin_login_view(request):
     return render(request, 'alumni/admin_login.html', {'form': form})
 
 
-@login_required
+def latest_pending_ids():
+    """
+    Subquery of the newest pending row id per (email_normalized, phone_e164),
+    ties on created_at going to the higher id. One pass over the pending rows
+    (status index) and a sort, instead of a per-row NOT EXISTS probe.
+    """
+    newest_first = Window(
+        RowNumber(),
+        partition_by=[F('email_normalized'), F('phone_e164')],
+        order_by=[F('created_at').desc(), F('id').desc()],
+    )
+    return (
+        Alumni.objects.filter(status='pending').order_by()
+        .annotate(contact_rank=newest_first).filter(contact_rank=1).values('id')
+    )
+
+
+@admin_required
 def admin_panel_view(request):
     """
     Show only the LATEST pending request per (email, phone),
-    so duplicate cards don’t appear.
+    so duplicate cards don’t appear; keyset-paginated.
     """
-    if not is_admin(request.user):
-        messages.error(request, 'Access denied')
-        return redirect('alumni:login')
-
-    pending_qs = Alumni.objects.filter(status='pending').order_by('-created_at', '-id')
-
-    seen = set()
-    unique_pending = []
-    for a in pending_qs:
-        key = ((a.email or '').strip().lower(), (a.contact_number or '').strip())
-        if key not in seen:
-            seen.add(key)
-            unique_pending.append(a)
-
-    approved_alumni = Alumni.objects.filter(status='approved').order_by('-created_at')
-
+    page_size = page_size_from(request)
+    pending_cursor = request.GET.get('pending_cursor')
+    pending_requests, pending_next = keyset_page(
+        Alumni.objects.filter(id__in=latest_pending_ids()),
+        ADMIN_SEARCH_ORDERING, pending_cursor, page_size,
+    )
+
+    # Approved alumni are not rendered here: the page's windowed table pulls
+    # them from admin_search_view a page at a time
     return render(request, 'alumni/admin_panel.html', {
-        'pending_requests': unique_pending,
-        'approved_alumni': approved_alumni,
-        'can_take_actions': is_admin(request.user),  # admins can act (see admin_action_view)
+        'pending_requests': pending_requests,
+        'pending_cursor': pending_cursor,
+        'pending_next_cursor': pending_next,
+        'can_take_actions': True,  # admins can act (see admin_action_view)
     })
 
 
 
-@login_required
+@admin_required
 def admin_review_view(request, alumni_id):
-    if not is_admin(request.user):
-        messages.error(request, 'Access denied')
-        return redirect('alumni:login')
     alumni = get_object_or_404(Alumni, id=alumni_id)
     return render(request, 'alumni/admin_review.html', {
         'alumni': alumni,
-        'can_take_actions': is_admin(request.user),
+        'can_take_actions': True,
     })
 
 
 
-@login_required
+@admin_required(redirect_to='alumni:admin_panel')
 def admin_action_view(request, alumni_id, action):
     if request.method != 'POST':
         messages.error(request, 'Invalid request method.')
         return redirect('alumni:admin_panel')
 
-    if not is_admin(request.user):
-        messages.error(request, 'Access denied')
-        return redirect('alumni:admin_panel')
-
     alumni = get_object_or_404(Alumni, id=alumni_id)
 
     if action == 'approve':
@@ -632,7 +598,45 @@ def admin_action_view(request, alumni_id, action):
     return redirect('alumni:admin_panel')
 
 
-@login_required
+@admin_required(json=True)
+def admin_otp_health_view(request):
+    """Rolling latency / error rate and circuit state of each OTP provider, per worker process."""
+    return JsonResponse({'providers': provider_health()})
+
+
+@admin_required
+def admin_stats_view(request):
+    """Registration statistics, read from the precomputed counters (see stats.py)."""
+    return render(request, 'alumni/admin_stats.html', {
+        'stats': stats_summary(limit=getattr(settings, 'STATS_DASHBOARD_LIMIT', 25)),
+    })
+
+
+@admin_required(json=True)
+def admin_stats_json_view(request):
+    """The dashboard's counters as JSON; ?limit=N caps the rows per dimension."""
+    limit = request.GET.get('limit', '')
+    return JsonResponse(stats_summary(limit=int(limit) if limit.isdigit() else None))
+
+
+def admin_alumni_json(alumni):
+    """One approved-alumni row as the admin panel's JavaScript expects it."""
+    return {
+        'id': alumni.id,
+        'name': alumni.name,
+        'photo_url': alumni.admin_photo_url,
+        'academic_association': alumni.academic_association,
+        'joining_year_ug': alumni.joining_year_ug,
+        'joining_year_pg': alumni.joining_year_pg,
+        'specialty': alumni.specialty or 'N/A',
+        'city': alumni.city,
+        'country': alumni.country,
+        'current_designation': alumni.current_designation or 'N/A',
+        'current_work_association': alumni.current_work_association or 'N/A',
+    }
+
+
+@admin_required(json=True)
 def admin_search_view(request):
     """
     Handles the live search AJAX request from the admin dashboard
@@ -650,49 +654,31 @@ def admin_search_view(request):
     designation = request.GET.get('designation', '')
 
     # Apply filters if parameters are provided
-    if name:
-        alumni_queryset = alumni_queryset.filter(name__icontains=name)
-    
     if joining_year:
         # Check both UG and PG joining years
         alumni_queryset = alumni_queryset.filter(
             Q(joining_year_ug=joining_year) | Q(joining_year_pg=joining_year)
         )
-        
-    if work_association:
-        alumni_queryset = alumni_queryset.filter(current_work_association__icontains=work_association)
-        
-    if specialization:
-        alumni_queryset = alumni_queryset.filter(specialty__icontains=specialization)
-        
-    if location:
-        # Search across city, state, and country
-        alumni_queryset = alumni_queryset.filter(
-            Q(city__icontains=location) | Q(state__icontains=location) | Q(country__icontains=location)
-        )
-        
-    if designation:
-        alumni_queryset = alumni_queryset.filter(current_designation__icontains=designation)
-
-    # Prepare the data for JSON response
-    # This format matches what your JavaScript expects
-    alumni_data = []
-    for alumni in alumni_queryset:
-        alumni_data.append({
-            'id': alumni.id,
-            'name': alumni.name,
-            'photo_url': alumni.safe_photo_url,  # CHANGED
-            'academic_association': alumni.academic_association,
-            'joining_year_ug': alumni.joining_year_ug,
-            'joining_year_pg': alumni.joining_year_pg,
-            'specialty': alumni.specialty or 'N/A',
-            'city': alumni.city,
-            'country': alumni.country,
-            'current_designation': alumni.current_designation or 'N/A',
-            'current_work_association': alumni.current_work_association or 'N/A',
-        })
 
-    return JsonResponse({'alumni': alumni_data})
+    # Free-text fields go through the full-text index (ranked)
+    alumni_queryset, ranked = apply_text_search(alumni_queryset, {
+        'name': name,
+        'work_association': work_association,
+        'specialization': specialization,
+        'location': location,
+        'designation': designation,
+    })
+    ordering = RANKED_ORDERING if ranked else ADMIN_SEARCH_ORDERING
+
+    cursor = request.GET.get('cursor')
+    page, next_cursor = keyset_page(alumni_queryset, ordering, cursor, page_size_from(request))
+
+    alumni_data = [admin_alumni_json(alumni) for alumni in page]
+
+    response = {'alumni': alumni_data, 'next_cursor': next_cursor}
+    if not cursor:
+        response['count'] = alumni_queryset.count() if next_cursor else len(alumni_data)
+    return JsonResponse(response)
 
 
 
@@ -719,7 +705,7 @@ def get_alumni_details_view(request, alumni_id):
     data = {
         'id': alumnus.id,
         'name': alumnus.name,
-        'photo_url': alumnus.safe_photo_url,  # CHANGED
+        'photo_url': alumnus.detail_photo_url,
         'joining_year_ug': alumnus.joining_year_ug,
         'joining_year_pg': alumnus.joining_year_pg if alumnus.joining_year_pg else 'N/A',
         'academic_association': alumnus.academic_association,
@@ -746,11 +732,8 @@ def get_alumni_details_view(request, alumni_id):
 
 
 
-@login_required
+@admin_required(redirect_to='alumni:admin_panel', message="You do not have permission to perform this action.")
 def admin_edit_alumni_view(request, alumni_id):
-    if not is_admin(request.user):
-        messages.error(request, "You do not have permission to perform this action.")
-        return redirect('alumni:admin_panel')
 
     alumnus = get_object_or_404(Alumni, id=alumni_id)
 
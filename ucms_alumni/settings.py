@@ -343,6 +343,8 @@ MEDIA_URL = "/media/"
 # >>> Only required change: point to the real uploads path in App Platform
 from pathlib import Path as _Path  # (safe alias)
 MEDIA_ROOT = _Path(os.getenv("MEDIA_ROOT", "/app/media"))
+# Alumni photo thumbnails (alumni/thumbnails.py): "WEBP" or "JPEG"
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "WEBP")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -389,12 +391,117 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "False") == "True"
 
+# ---------------------------------------------------------------------
+# Cache (OTP store and other shared state). Must be shared between gunicorn
+# workers: Redis when REDIS_URL is set (needs the "redis" package), else a
+# DB tables created by migrations alumni/0009 and 0014. Live OTPs get their
+# own alias: a full DatabaseCache culls a third of its entries on the next
+# write, expired or not, so they must not share MAX_ENTRIES with the
+# rate-limit, facet and role entries.
+# ---------------------------------------------------------------------
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        },
+        "otp": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "otp",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "alumni_cache",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))},
+        },
+        "otp": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "alumni_otp_cache",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("OTP_CACHE_MAX_ENTRIES", "1000000"))},
+        },
+    }
+
 # ---------------------------------------------------------------------
 # App constants / OTP & provider keys (used in utils.py)
 # ---------------------------------------------------------------------
 OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", "5"))
+# Live OTPs: CacheOTPStore (TTL entries) or ModelOTPStore (OTPVerification table)
+OTP_STORE = os.getenv("OTP_STORE", "alumni.otp_store.CacheOTPStore")
+OTP_CACHE_ALIAS = "otp"
 MAILTRAP_API_KEY = os.getenv("MAILTRAP_API_KEY", "")
+MAILTRAP_BASE_URL = os.getenv("MAILTRAP_BASE_URL", "https://send.api.mailtrap.io/api")
+MAILTRAP_POOL_SIZE = int(os.getenv("MAILTRAP_POOL_SIZE", "10"))
 TWO_FACTOR_API_KEY = os.getenv("TWO_FACTOR_API_KEY", "")
+# 2Factor HTTP client (alumni/sms.py); point BASE_URL at `manage.py fake_2factor` locally
+TWO_FACTOR_BASE_URL = os.getenv("TWO_FACTOR_BASE_URL", "https://2factor.in/API/V1")
+TWO_FACTOR_POOL_SIZE = int(os.getenv("TWO_FACTOR_POOL_SIZE", "10"))
+TWO_FACTOR_RETRIES = int(os.getenv("TWO_FACTOR_RETRIES", "2"))
+TWO_FACTOR_CONNECT_TIMEOUT = float(os.getenv("TWO_FACTOR_CONNECT_TIMEOUT", "3.05"))
+TWO_FACTOR_READ_TIMEOUT = float(os.getenv("TWO_FACTOR_READ_TIMEOUT", "5"))
+
+# Token buckets for OTP-sending endpoints (alumni/ratelimit.py): "<count>/<period>"
+OTP_RATE_LIMITS = {
+    "contact": os.getenv("OTP_RATE_CONTACT", "5/15m"),
+    "ip": os.getenv("OTP_RATE_IP", "20/15m"),
+    "global": os.getenv("OTP_RATE_GLOBAL", "300/1m"),
+}
+# Trusted reverse proxies in front of gunicorn (0 = use REMOTE_ADDR)
+RATELIMIT_PROXY_COUNT = int(os.getenv("RATELIMIT_PROXY_COUNT", "0"))
+
+# Admin role lookups (alumni/roles.py) are cached per user; AdminUser changes invalidate them
+ROLE_CACHE_SECONDS = int(os.getenv("ROLE_CACHE_SECONDS", "300"))
+
+# Country code assumed for phone numbers entered without one (alumni/contacts.py)
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "91")
+
+# Directory facet counts (alumni/facets.py): values per facet, cache lifetime (invalidated on Alumni changes)
+FACET_LIMIT = int(os.getenv("FACET_LIMIT", "12"))
+FACET_CACHE_SECONDS = int(os.getenv("FACET_CACHE_SECONDS", "600"))
+
+# Statistics dashboard (alumni/stats.py): rows shown per dimension; the JSON endpoint takes ?limit=
+STATS_DASHBOARD_LIMIT = int(os.getenv("STATS_DASHBOARD_LIMIT", "25"))
+
+# OTP delivery providers per channel (alumni/otp_backends.py). Alternatives:
+# ConsoleProvider (log only) and FileProvider (OPTIONS: {"PATH": ...}).
+OTP_BACKENDS = {
+    "sms": {
+        "BACKEND": os.getenv("OTP_SMS_BACKEND", "alumni.otp_backends.TwoFactorProvider"),
+        "OPTIONS": {"FAILURE_THRESHOLD": 0.5, "COOLDOWN_SECONDS": 30},
+    },
+    "email": {
+        "BACKEND": os.getenv("OTP_EMAIL_BACKEND", "alumni.otp_backends.MailtrapProvider"),
+        "OPTIONS": {"FAILURE_THRESHOLD": 0.5, "COOLDOWN_SECONDS": 30},
+    },
+}
+
+# ---------------------------------------------------------------------
+# Background jobs (alumni/jobs.py, `manage.py run_workers`)
+# ---------------------------------------------------------------------
+# Run jobs inline instead of via a worker (local dev only)
+JOB_QUEUE_EAGER = os.getenv("JOB_QUEUE_EAGER", "False") == "True"
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_RETRY_MAX_SECONDS = int(os.getenv("JOB_RETRY_MAX_SECONDS", "300"))
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "300"))  # seconds before a running job is reclaimed
+
+# Housekeeping (alumni/housekeeping.py, `manage.py purge_stale`)
+PENDING_REGISTRATION_MAX_AGE_HOURS = int(os.getenv("PENDING_REGISTRATION_MAX_AGE_HOURS", "48"))
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+# Seconds between purges run by `run_workers`; 0 = off (schedule purge_stale instead)
+PURGE_STALE_INTERVAL = int(os.getenv("PURGE_STALE_INTERVAL", "0"))
+
+# ---------------------------------------------------------------------
+# Directory search & pagination (alumni/search.py, alumni/pagination.py)
+# ---------------------------------------------------------------------
+FUZZY_NAME_SEARCH = os.getenv("FUZZY_NAME_SEARCH", "True") == "True"
+FUZZY_NAME_THRESHOLD = float(os.getenv("FUZZY_NAME_THRESHOLD", "0.3"))
+FUZZY_INDEX_TTL = int(os.getenv("FUZZY_INDEX_TTL", "600"))  # seconds
+DIRECTORY_PAGE_SIZE = int(os.getenv("DIRECTORY_PAGE_SIZE", "24"))
+DIRECTORY_MAX_PAGE_SIZE = int(os.getenv("DIRECTORY_MAX_PAGE_SIZE", "100"))
 
 # ---------------------------------------------------------------------
 # Logging (to App Platform logs)